@@ -0,0 +1,88 @@
+from collections import OrderedDict
+
+##########################################################################
+## Backlog                                                              ##
+## -------------------------------------------------------------------- ##
+## Class that keeps the dialogue history as plain strings, one entry of ##
+## (name, lines) per textbox. Only the pages the player views are       ##
+## rendered, into a small cache of Text objects, and the oldest entries ##
+## are dropped once the history grows past its cap.                     ##
+##########################################################################
+
+class Backlog(object):
+    PAGES = 4  ## Number of rendered pages to keep cached
+
+    #################
+    ## Constructor ##
+    #################
+    def __init__(self, cap):
+        self.cap     = cap   ## Largest number of entries to retain
+        self.entries = []    ## List of (name, lines) string entries
+        self.first   = 0     ## Number of entries dropped from the front
+        self.pages   = OrderedDict() ## Entry number to rendered page, oldest first
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    ###################################################
+    ## Method to start a new entry for a speaker.    ##
+    ## Returns whether the oldest entry was dropped  ##
+    ## to make room for it                           ##
+    ###################################################
+    def add(self, name):
+        self.entries.append((name, []))
+        if self.cap > 0 and len(self.entries) > self.cap:
+            self.entries.pop(0)
+            self.pages.pop(self.first, None)
+            self.first += 1
+            return True
+        return False
+
+    ###################################################
+    ## Method to add a line of dialogue to the       ##
+    ## newest entry                                  ##
+    ###################################################
+    def add_line(self, line):
+        self.entries[-1][1].append(line)
+        self.pages.pop(self.first + len(self.entries) - 1, None)
+
+    ###################################################
+    ## Method to drop the newest entry               ##
+    ###################################################
+    def pop(self):
+        self.pages.pop(self.first + len(self.entries) - 1, None)
+        return self.entries.pop()
+
+    ###################################################
+    ## Method to drop the newest entries until only  ##
+    ## the given number of entries were ever added   ##
+    ###################################################
+    def truncate(self, count):
+        while len(self.entries) > 0 and self.first + len(self.entries) > count:
+            self.pop()
+
+    ###################################################
+    ## Method to copy the entries, so they can be    ##
+    ## read while the backlog keeps growing          ##
+    ###################################################
+    def snapshot(self):
+        return [(name, list(lines)) for name, lines in self.entries]
+
+    ###################################################
+    ## Method to get the rendered page of an entry,  ##
+    ## rendering it through the given function of    ##
+    ## (name, lines) if it is not cached             ##
+    ###################################################
+    def get_page(self, index, render):
+        key = self.first + index
+        page = self.pages.pop(key, None)
+        if page == None:
+            name, lines = self.entries[index]
+            page = render(name, lines)
+        self.pages[key] = page
+        while len(self.pages) > self.PAGES:
+            self.pages.popitem(last=False)
+        return page
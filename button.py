@@ -1,6 +1,7 @@
 import pygame
 from pygame.locals import *
 from text import Text
+from fade import Fadeable
 
 ##########################################################################
 ## Button                                                               ##
@@ -10,7 +11,7 @@ from text import Text
 ## sound or change color to signal interaction.                         ##
 ##########################################################################
             
-class Button(object):
+class Button(Fadeable):
     #################
     ## Constructor ##
     #################
@@ -35,24 +36,32 @@ class Button(object):
 
         self.alpha = 0 if fadein else 255 ## Starting alpha transparency value
 
+        self.color = tuple(color) ## Text color of the face to draw
+        self.faces = {}           ## Pre-composited faces keyed by text color
+
     ######################################
     ## Method to draw to target surface ##
     ######################################
     def draw(self, surface):
-        ## If the current alpha channel is at all transparent, fade in
-        if self.alpha < 255:
+        ## Fade in until we are opaque
+        return self.draw_faded(surface, self.get_face(), self.rect)
+
+    ########################################################
+    ## Method to get the button graphic composited with   ##
+    ## its text, building it once per text color          ##
+    ########################################################
+    def get_face(self):
+        ## Scrolling text changes every frame, so it can't be cached
+        if self.text.scrollable:
             image = self.image.copy()
             self.text.draw(image, anchor=self.anchor)
-            image.fill((255,255,255,self.alpha), None, pygame.BLEND_RGBA_MULT)
-            surface.blit(image, self.rect)
-            self.alpha += 12
-            if self.alpha > 255:
-                self.alpha = 255
-        ## If we are already opaque, no need to update alpha channel
-        else:
+            return image
+        if self.color not in self.faces:
+            self.text.update(self.text.string, self.color)
             image = self.image.copy()
             self.text.draw(image, anchor=self.anchor)
-            surface.blit(image, self.rect)
+            self.faces[self.color] = image
+        return self.faces[self.color]
 
     #################################################
     ## Method to update the text within the button ##
@@ -61,7 +70,8 @@ class Button(object):
         ## Only update if necessary
         if string != None:
             self.text.update(string, self.text.color)
+            self.faces = {}
         elif color != None:
-            self.text.update(self.text.string, color)            
+            self.color = tuple(color)
         elif speed != None:
             self.text.scroll_speed = speed
@@ -1,5 +1,6 @@
-import pygame, copy
+import pygame
 from pygame.locals import *
+from fade import Fadeable
 
 ##########################################################################
 ## Character                                                            ##
@@ -8,7 +9,7 @@ from pygame.locals import *
 ## various attributes that help optimize drawing routines.              ##
 ##########################################################################
             
-class Character(object):
+class Character(Fadeable):
     #################
     ## Constructor ##
     #################
@@ -26,14 +27,5 @@ class Character(object):
     ## Method to draw to target surface ##
     ######################################
     def draw(self, surface):
-        ## If the current alpha channel is at all transparent, fade in
-        if self.alpha < 255:
-            image = copy.copy(self.image)
-            image.fill((255,255,255,self.alpha), None, pygame.BLEND_RGBA_MULT)
-            surface.blit(image, self.rect)
-            self.alpha += 12
-            if self.alpha > 255:
-                self.alpha = 255
-        ## If we are opaque, no need to update alpha channel
-        else:
-            surface.blit(self.image, self.rect)
+        ## Fade in until we are opaque
+        return self.draw_faded(surface, self.image, self.rect)
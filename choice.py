@@ -1,6 +1,7 @@
 import pygame
 from pygame.locals import *
 from text import Text
+from fade import Fadeable
 
 ##########################################################################
 ## Choice                                                               ##
@@ -8,7 +9,7 @@ from text import Text
 ## Class that defines instances of on-screen clickable dialogue options ##
 ## which, when clicked, can alter the flow of the game.                 ##
 ##########################################################################
-class Choice(object):
+class Choice(Fadeable):
     #################
     ## Constructor ##
     #################
@@ -21,6 +22,9 @@ class Choice(object):
         self.image = image.copy().convert_alpha()
         self.alpha = 0  ## Alpha channel is transparent
 
+        self.color = tuple(self.text.color) ## Text color of the face to draw
+        self.faces = {} ## Pre-composited faces keyed by text color
+
         ## Rectangular box information for positioning purposes
         self.rect = pygame.Rect(0,self.pos[1],image.get_width(),image.get_height())
         self.rect.centerx = self.pos[0] ## Center the box on-screen
@@ -29,23 +33,23 @@ class Choice(object):
     ## Method to draw to target surface ##
     ######################################
     def draw(self, surface):
-        ## If we are at all transparent, update the alpha channel
-        if self.alpha < 255:
-            image = self.image.copy()
-            self.text.draw(image, anchor="center")
-            image.fill((255,255,255,self.alpha), None, pygame.BLEND_RGBA_MULT)
-            surface.blit(image, self.rect.topleft)
-            self.alpha += 12
-            if self.alpha > 255:
-                self.alpha = 255
-        ## If we are fully opaque, no need to update
-        else:
+        ## Fade in until we are fully opaque
+        return self.draw_faded(surface, self.get_face(), self.rect.topleft)
+
+    ########################################################
+    ## Method to get the choice graphic composited with   ##
+    ## its text, building it once per text color          ##
+    ########################################################
+    def get_face(self):
+        if self.color not in self.faces:
+            self.text.update(self.text.string, self.color)
             image = self.image.copy()
             self.text.draw(image, anchor="center")
-            surface.blit(image, self.rect.topleft)
+            self.faces[self.color] = image
+        return self.faces[self.color]
 
     #################################################
     ## Method to modify the current string's color ##
     #################################################
     def update(self, color):
-        self.text.update(self.text.string, color)
+        self.color = tuple(color)
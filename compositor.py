@@ -0,0 +1,101 @@
+import pygame
+from pygame.locals import *
+
+##########################################################################
+## Compositor                                                           ##
+## -------------------------------------------------------------------- ##
+## Class that draws a frame as a stack of named layers, bottom first.   ##
+## Layers that are fully transparent or lie entirely under an opaque    ##
+## layer above them are never drawn, and the screen is only cleared     ##
+## when no opaque layer covers all of it. While the scene layers stay   ##
+## the same they are kept composited, and drawn as a single blit.       ##
+##########################################################################
+
+class Compositor(object):
+    ## Layer names, bottom first
+    LAYERS = ("background-old", "background-new", "characters", "widget", "textbox", "choices", "buttons", "notice")
+    SCENE  = 3  ## Number of bottom layers that make up the scene
+
+    #################
+    ## Constructor ##
+    #################
+    def __init__(self, size, fill=(0,0,0)):
+        self.rect   = pygame.Rect((0,0), size)  ## Area of the screen
+        self.fill   = fill  ## Color under every layer
+        self.layers = {}    ## Layer name to (draw function, rect, alpha, opaque) for this frame
+        self.scene  = None  ## Cached composite of the scene layers
+        self.key    = None  ## What the cached composite was drawn from
+
+    ###################################################
+    ## Method to check whether a surface hides all   ##
+    ## of what is under it                           ##
+    ###################################################
+    @staticmethod
+    def is_opaque(surface):
+        if surface.get_flags() & SRCALPHA or surface.get_colorkey() != None:
+            return False
+        return surface.get_alpha() in (None, 255)
+
+    ###################################################
+    ## Method to add a layer to the frame, given a   ##
+    ## function that draws it onto a surface, the    ##
+    ## screen area it covers, its alpha and whether  ##
+    ## it hides all of that area                     ##
+    ###################################################
+    def add(self, name, draw, rect, alpha=255, opaque=False):
+        self.layers[name] = (draw, rect, alpha, opaque)
+
+    ###################################################
+    ## Method to draw the frame's visible layers     ##
+    ## onto a surface, then start an empty frame.    ##
+    ## Given a key describing the scene layers, they ##
+    ## are only drawn when it changes, and otherwise ##
+    ## come from the cached composite. Returns the   ##
+    ## names of the layers drawn                     ##
+    ###################################################
+    def compose(self, surface, key=None):
+        visible = []
+        covers  = []  ## Rects of the opaque layers above the current one
+        for name in reversed(self.LAYERS):
+            if name not in self.layers:
+                continue
+            draw, rect, alpha, opaque = self.layers[name]
+            if alpha <= 0:
+                continue
+            if True in [cover.contains(rect) for cover in covers]:
+                continue
+            visible.append((name, draw))
+            if opaque:
+                covers.append(pygame.Rect(rect))
+
+        visible.reverse()
+        is_covered = True in [cover.contains(self.rect) for cover in covers]
+        self.layers = {}
+
+        if key == None:
+            self.key = None
+            if not is_covered:
+                surface.fill(self.fill)
+            for name, draw in visible:
+                draw(surface)
+            return [name for name, draw in visible]
+
+        ## Redraw the scene composite only if the scene changed
+        scene = [(name, draw) for name, draw in visible if name in self.LAYERS[:self.SCENE]]
+        drawn = []
+        if key != self.key:
+            if self.scene == None:
+                self.scene = pygame.Surface(self.rect.size, 0, surface)
+            if not is_covered:
+                self.scene.fill(self.fill)
+            for name, draw in scene:
+                draw(self.scene)
+            self.key = key
+            drawn = [name for name, draw in scene]
+        surface.blit(self.scene, (0,0))
+
+        for name, draw in visible:
+            if name not in self.LAYERS[:self.SCENE]:
+                draw(surface)
+                drawn.append(name)
+        return drawn
@@ -0,0 +1,63 @@
+import pygame
+from pygame.locals import *
+
+##########################################################################
+## Fadeable                                                             ##
+## -------------------------------------------------------------------- ##
+## Base class for on-screen objects that fade in through their alpha    ##
+## member. Blits through per-surface alpha where the surface format     ##
+## allows it, and otherwise through a small cache of pre-multiplied     ##
+## alpha steps, so fading never copies and multiplies every frame.      ##
+##########################################################################
+
+class Fadeable(object):
+    FADE_STEP   = 12  ## Alpha channel units gained per frame while fading in
+    FADE_LEVELS = 16  ## Number of cached alpha steps for per-pixel alpha images
+
+    ## Whether per-surface alpha also applies to per-pixel alpha surfaces,
+    ## which holds from pygame 2 onwards
+    SURFACE_ALPHA = int(pygame.version.vernum[0]) >= 2
+
+    ######################################################
+    ## Method to blit an image at the current alpha and ##
+    ## advance the fade by one frame. Returns whether   ##
+    ## the result differs from the previous draw        ##
+    ######################################################
+    def draw_faded(self, surface, image, dest):
+        drawn = (image, self.alpha, tuple(dest))
+        changed = drawn != getattr(self, "drawn", None)
+        self.drawn = drawn
+
+        ## If the current alpha channel is at all transparent, fade in
+        if self.alpha < 255:
+            self.blit_alpha(surface, image, dest, max(0, self.alpha))
+            self.alpha += self.FADE_STEP
+            if self.alpha > 255:
+                self.alpha = 255
+        ## If we are already opaque, no need to update alpha channel
+        else:
+            surface.blit(image, dest)
+        return changed
+
+    #################################################
+    ## Method to blit an image at a given alpha    ##
+    #################################################
+    def blit_alpha(self, surface, image, dest, alpha):
+        ## Modulate the whole surface if the format allows for it
+        if self.SURFACE_ALPHA or not image.get_flags() & SRCALPHA:
+            old_alpha = image.get_alpha()
+            image.set_alpha(alpha)
+            surface.blit(image, dest)
+            image.set_alpha(old_alpha)
+            return
+
+        ## Otherwise reuse a pre-multiplied copy of the nearest alpha step
+        if getattr(self, "fade_source", None) is not image:
+            self.fade_source = image
+            self.fade_cache = {}
+        level = alpha * self.FADE_LEVELS / 256
+        if level not in self.fade_cache:
+            step = image.copy()
+            step.fill((255,255,255,level * 256 / self.FADE_LEVELS), None, pygame.BLEND_RGBA_MULT)
+            self.fade_cache[level] = step
+        surface.blit(self.fade_cache[level], dest)
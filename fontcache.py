@@ -0,0 +1,46 @@
+import pygame
+from pygame.locals import *
+
+##########################################################################
+## FontCache                                                            ##
+## -------------------------------------------------------------------- ##
+## Static, process-wide registry of loaded fonts. Fonts are keyed by    ##
+## their name and size, so every Text, Button and Choice that asks for  ##
+## the same face shares a single parsed font instead of reopening the   ##
+## TTF file from disk.                                                  ##
+##########################################################################
+
+class FontCache(object):
+    fonts = {}  ## Dictionary of (fontname, size) to font objects
+
+    ##############################################
+    ## Method to fetch a font, loading it once  ##
+    ##############################################
+    @staticmethod
+    def get(fontname, size):
+        key = (fontname, size)
+        if key not in FontCache.fonts:
+            try:
+                FontCache.fonts[key] = pygame.font.Font("data/fonts/%s.ttf" %(fontname), size)
+            except Exception as e:
+                ## Share a single system fallback font per size
+                FontCache.fonts[key] = FontCache.get_fallback(size)
+        return FontCache.fonts[key]
+
+    ##################################################
+    ## Method to fetch the system font fallback for ##
+    ## a given size, used when a TTF is missing     ##
+    ##################################################
+    @staticmethod
+    def get_fallback(size):
+        key = (None, size)
+        if key not in FontCache.fonts:
+            FontCache.fonts[key] = pygame.font.SysFont("Arial", size)
+        return FontCache.fonts[key]
+
+    ###########################################
+    ## Method to release every cached font   ##
+    ###########################################
+    @staticmethod
+    def clear():
+        FontCache.fonts = {}
@@ -0,0 +1,69 @@
+##########################################################################
+## GameState                                                            ##
+## -------------------------------------------------------------------- ##
+## Record of everything needed to resume a scene apart from the         ##
+## backlog: where the script is, what is on screen and what is playing. ##
+## The interpreter keeps the pieces of it up to date as lines execute,  ##
+## so taking a snapshot is a shallow copy instead of a script rescan.   ##
+##########################################################################
+
+class GameState(object):
+    #################
+    ## Constructor ##
+    #################
+    def __init__(self, scene, index, text_index, background, music, shake, banks, chars, widget, variables, backlog_count,
+                 hide_alpha, fade_rate, anchor):
+        self.scene      = scene       ## Scene file name
+        self.index      = index       ## Script index to resume from
+        self.text_index = text_index  ## Index of the newest backlog entry
+        self.background = background  ## [folder, file] of the scene image
+        self.music      = music       ## Background music name, or None
+        self.shake      = shake       ## (x, y) shake magnitude, or None
+        self.banks      = banks       ## Image bank to the character loaded into it
+        self.chars      = chars       ## (bank, sub-image, position, name) per drawn character
+        self.widget     = widget      ## Date-time widget text, or "null"
+        self.variables  = variables   ## Dictionary of in-game variables
+        self.backlog_count = backlog_count ## Number of backlog entries ever added
+        self.hide_alpha = hide_alpha  ## Alpha the GUI is shown or hidden at
+        self.fade_rate  = fade_rate   ## Fade rate in alpha channel units per frame
+        self.anchor     = anchor      ## Anchor string for zooming in and out
+
+    ###################################################
+    ## Method to copy the record, so later changes   ##
+    ## to the game do not show up in the copy        ##
+    ###################################################
+    def copy(self):
+        return GameState(self.scene, self.index, self.text_index, list(self.background), self.music, self.shake,
+                         dict(self.banks), list(self.chars), self.widget, dict(self.variables), self.backlog_count,
+                         self.hide_alpha, self.fade_rate, self.anchor)
+
+    ###################################################
+    ## Method to flatten the record into a dict of   ##
+    ## field to comparable value, with one field per ##
+    ## nonzero variable so changes stay small        ##
+    ###################################################
+    def flatten(self):
+        fields = {"scene":self.scene, "index":self.index, "text_index":self.text_index,
+                  "background":tuple(self.background), "music":self.music, "shake":self.shake,
+                  "banks":tuple(sorted(self.banks.items())), "chars":tuple(self.chars),
+                  "widget":self.widget, "backlog_count":self.backlog_count,
+                  "hide_alpha":self.hide_alpha, "fade_rate":self.fade_rate, "anchor":self.anchor}
+        for var in self.variables:
+            if self.variables[var] != 0:
+                fields[("var", var)] = self.variables[var]
+        return fields
+
+    ###################################################
+    ## Method to rebuild a record from its flattened ##
+    ## fields. Variables left out of it are zero     ##
+    ###################################################
+    @staticmethod
+    def unflatten(fields):
+        variables = {}
+        for key in fields:
+            if isinstance(key, tuple) and fields[key] != None:
+                variables[key[1]] = fields[key]
+        return GameState(fields["scene"], fields["index"], fields["text_index"], list(fields["background"]),
+                         fields["music"], fields["shake"], dict(fields["banks"]), list(fields["chars"]),
+                         fields["widget"], variables, fields["backlog_count"],
+                         fields["hide_alpha"], fields["fade_rate"], fields["anchor"])
@@ -0,0 +1,77 @@
+import pygame, threading
+from pygame.locals import *
+from collections import OrderedDict
+
+##########################################################################
+## ImageCache                                                           ##
+## -------------------------------------------------------------------- ##
+## Least recently used cache of converted images, keyed by their file   ##
+## path and the conversion applied to them. Evicts the oldest images    ##
+## once the pixel data held goes over a byte budget. Cached surfaces    ##
+## are shared, so callers copy them before changing them in place. The  ##
+## prefetch worker checks the cache too, so every access holds a lock.  ##
+##########################################################################
+
+class ImageCache(object):
+    #################
+    ## Constructor ##
+    #################
+    def __init__(self, budget):
+        self.budget = budget        ## Largest number of pixel bytes to hold
+        self.size   = 0             ## Number of pixel bytes currently held
+        self.images = OrderedDict() ## (path, mode) to surface, oldest first
+        self.lock   = threading.Lock()
+
+    ###############################################
+    ## Method to measure a surface's pixel data  ##
+    ###############################################
+    def get_size(self, image):
+        return image.get_pitch() * image.get_height()
+
+    ###############################################
+    ## Method to check whether a path is cached  ##
+    ## under any conversion mode                 ##
+    ###############################################
+    def contains(self, path):
+        with self.lock:
+            for key in self.images:
+                if key[0] == path:
+                    return True
+            return False
+
+    ##################################################
+    ## Method to fetch a cached image, or None, and ##
+    ## mark it as the most recently used            ##
+    ##################################################
+    def get(self, path, mode):
+        key = (path, mode)
+        with self.lock:
+            image = self.images.pop(key, None)
+            if image != None:
+                self.images[key] = image
+            return image
+
+    ##################################################
+    ## Method to add an image, evicting the least   ##
+    ## recently used ones to stay within budget     ##
+    ##################################################
+    def put(self, path, mode, image):
+        key = (path, mode)
+        with self.lock:
+            if key in self.images:
+                self.size -= self.get_size(self.images.pop(key))
+            self.images[key] = image
+            self.size += self.get_size(image)
+
+            ## Always keep the newest image, even if it alone is over budget
+            while self.size > self.budget and len(self.images) > 1:
+                old_key, old_image = self.images.popitem(last=False)
+                self.size -= self.get_size(old_image)
+
+    ###########################################
+    ## Method to release every cached image  ##
+    ###########################################
+    def clear(self):
+        with self.lock:
+            self.images = OrderedDict()
+            self.size = 0
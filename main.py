@@ -9,7 +9,7 @@
 #
 # Licensed under the MIT License.
 
-import pygame, os, glob, datetime, random, codecs, sys
+import pygame, os, glob, datetime, random, sys, math
 from pygame.locals import *
 from string import ascii_lowercase
 from slider import Slider
@@ -17,6 +17,20 @@ from button import Button
 from text import Text
 from choice import Choice
 from character import Character
+from script import Script, OP
+from textbox import TextBox
+from compositor import Compositor
+from gamestate import GameState
+from rollback import Rollback
+from readlog import ReadLog
+from backlog import Backlog
+from prefetch import Prefetcher
+from imagecache import ImageCache
+from zoompyramid import ZoomPyramid
+from savestore import SaveStore
+from savecontainer import SaveContainer
+from saveformat import SaveSerializer
+from savewriter import SaveWriter
 
 ## Center the display on-screen
 os.environ["SDL_VIDEO_CENTERED"] = "1"
@@ -57,6 +71,11 @@ class STATE:
 class CONST:
     SPEED_RANGE = 30  ## Range of text scrolling speeds in pixels per frame
     FADE        = 5   ## Fade rate in alpha per second
+    IDLE_WAIT   = 500 ## Longest time in milliseconds to block for input when idle
+    IDLE_EVENT  = USEREVENT ## Event that wakes up an idle game loop
+    QUICK_SLOT  = 127 ## Save slot reserved for the quick save, past the largest slot grid allowed
+    NOTICE_TIME = 1500 ## Milliseconds a notice such as a failed quick load stays on-screen
+    SKIP_REDRAW = 100 ## Milliseconds to fast-forward for between redraws while skipping
 
 ##########################################################################
 ## Main                                                                 ##
@@ -80,6 +99,10 @@ class Main:
         self.screen_dimension = (1280,720)
         self.fade_color = (0,0,0)
         self.fullscreen = False
+        self.dirty_rects = False
+        self.image_cache_size = 64
+        self.zoom_out_keyframes = False
+        self.save_backend = "files"
         self.volume = 0.5
 
         ## Read in values from configuration file
@@ -96,6 +119,23 @@ class Main:
                 temp = line.split(":")[1].lstrip().rstrip()
                 if int(temp):
                     self.fullscreen = True
+            ## Toggle dirty rectangle rendering mode
+            elif line.startswith("dirty_rects:"):
+                temp = line.split(":")[1].lstrip().rstrip()
+                if int(temp):
+                    self.dirty_rects = True
+            ## Set up the image cache budget in megabytes
+            elif line.startswith("image_cache_size:"):
+                temp = line.split(":")[1]
+                self.image_cache_size = int(temp)
+            ## Toggle precomputed keyframes for zooming out
+            elif line.startswith("zoom_out_keyframes:"):
+                temp = line.split(":")[1].lstrip().rstrip()
+                if int(temp):
+                    self.zoom_out_keyframes = True
+            ## Choose between one file per save slot or a single save container
+            elif line.startswith("save_backend:"):
+                self.save_backend = line.split(":")[1].lstrip().rstrip()
             ## Set up the fade color
             elif line.startswith("fade_color:"):
                 temp = line.split(":")[1].split(",")
@@ -120,13 +160,49 @@ class Main:
         ## Set up the game clock to poll events with
         self.clock = pygame.time.Clock()
 
+        ## Converted images shared between scenes, within a memory budget
+        self.images = ImageCache(self.image_cache_size * 1024 * 1024)
+        ## Background loader for the assets of upcoming script lines
+        self.prefetcher = Prefetcher(self.images)
+
+        ## Save slot files and their index, or a single container that
+        ## imports the save slot files the first time it is created
+        if self.save_backend == "container":
+            self.saves = SaveContainer("data/data/", SaveStore("data/data/"))
+        else:
+            self.saves = SaveStore("data/data/")
+        self.serializer = SaveSerializer()
+        self.save_writer = SaveWriter(self.saves) ## Writes saves in the background
+        self.quick_save = None       ## (state, backlog entries, timestamp) of the quick save
+        self.quick_pending = False   ## Whether the quick save has yet to be written out
+        self.read_log = ReadLog("data/data/") ## Lines of each scene the player has seen
+
+        self.compositor = Compositor(self.screen_dimension) ## Draws scene frames as culled layers
+
         self.load_images()   ## Load all images
         self.set_constants() ## Set anchoring constants
 
+        ## Table of scripting language opcodes to their handlers
+        self.opcodes = {OP.COMMENT:self.exec_comment, OP.FORCEQUIT:self.exec_forcequit,
+                        OP.LOAD:self.exec_load, OP.UNLOAD:self.exec_unload,
+                        OP.TEXT:self.exec_text, OP.WAIT:self.exec_wait,
+                        OP.SHAKE:self.exec_shake, OP.CHOICE:self.exec_choice,
+                        OP.OPTION:self.exec_option, OP.BRANCH:self.exec_branch,
+                        OP.SETANCHOR:self.exec_setanchor, OP.SCENEIN:self.exec_scenein,
+                        OP.SCENEOUT:self.exec_sceneout, OP.MUSIC:self.exec_music,
+                        OP.SOUND:self.exec_sound, OP.SETFADE:self.exec_setfade,
+                        OP.HIDE:self.exec_hide, OP.SHOW:self.exec_show,
+                        OP.SWAP:self.exec_swap, OP.WIDGET:self.exec_widget,
+                        OP.VARIABLE:self.exec_variable, OP.IF:self.exec_if,
+                        OP.STRING:self.exec_string}
+
     def _quit(self):
         ###########################################
         ## Method for safe and easy game exiting ##
         ###########################################
+        self.write_quick_save()
+        self.save_writer.flush() ## Finish writing any saves first
+        self.read_log.flush()
         pygame.quit()
         raise SystemExit
     
@@ -142,6 +218,24 @@ class Main:
             self.draw_splash()
             self.draw_title()
 
+    def load_image(self, path, mode="convert_alpha"):
+        ##########################################################
+        ## Returns the image at the given path converted with   ##
+        ## the given mode, from the image cache if possible,    ##
+        ## then from the prefetcher, and otherwise from disk    ##
+        ##########################################################
+        image = self.images.get(path, mode)
+        if image == None:
+            image = self.prefetcher.take(path)
+            if image == None:
+                image = pygame.image.load(path)
+            if mode == "convert":
+                image = image.convert()
+            else:
+                image = image.convert_alpha()
+            self.images.put(path, mode, image)
+        return image
+
     def get_mouse_pos(self):
         ########################################
         ## Returns the current mouse position ##
@@ -189,6 +283,8 @@ class Main:
         string += "text_font:           %s\n" %(self.dialogue_font)        
         string += "text_foreground:     %d, %d, %d\n" %(self.dialogue_font_color[0], self.dialogue_font_color[1], self.dialogue_font_color[2])
         string += "backlog_foreground:  %d, %d, %d\n" %(self.dialogue_prev_color[0], self.dialogue_prev_color[1], self.dialogue_prev_color[2])
+        string += "backlog_size:        %d\n" %(self.backlog_size)
+        string += "rollback_size:       %d\n" %(self.rollback_size)
         string += "text_shadow:         %d, %d, %d\n" %(self.dialogue_shadow_color[0], self.dialogue_shadow_color[1], self.dialogue_shadow_color[2])
         string += "textbox_padding:     %d\n" %(self.textbox_margin)
         string += "choice_padding:      %d\n" %(self.option_margin)
@@ -203,11 +299,15 @@ class Main:
         string += "#######################\n"
         string += "caption:             %s\n" %(self.caption)
         string += "is_fullscreen:       %d\n" %(int(self.fullscreen))
+        string += "dirty_rects:         %d\n" %(int(self.dirty_rects))
+        string += "image_cache_size:    %d\n" %(self.image_cache_size)
+        string += "zoom_out_keyframes:  %d\n" %(int(self.zoom_out_keyframes))
         string += "fade_color:          %d, %d, %d\n" %(self.fade_color[0], self.fade_color[1], self.fade_color[2])
         string += "window_size:         %d, %d\n" %(self.screen_dimension[0], self.screen_dimension[1])
         string += "logo_anchor:         %d, %d\n" %(self.title_pos[0], self.title_pos[1])
         string += "savebox_anchor:      %d, %d\n" %(self.save_list_pos[0], self.save_list_pos[1])
         string += "save_grid_dimension: %d, %d\n" %(self.grid_size[0], self.grid_size[1])
+        string += "save_backend:        %s\n" %(self.save_backend)
         string += "back_anchor:         %d, %d\n\n" %(self.to_title_pos[0], self.to_title_pos[1])
         string += "#######################\n"
         string += "## SOUND HANDLING    ##\n"
@@ -254,6 +354,7 @@ class Main:
         string += "## INITIAL SCRIPT    ##\n"
         string += "#######################\n"
         string += "root_scene:          %s\n" %(self.starting_scene)
+        string += "lines_per_frame:     %d\n" %(self.lines_per_frame)
 
         fi = open("data/data/config.nec", "w")
         fi.write(string)
@@ -334,6 +435,9 @@ class Main:
             self.draw_buttons()
             pygame.display.flip()
 
+            ## Sleep until input once the title has faded in
+            self.wait_for_input(self.title_alpha >= 255 and self.is_menu_idle(self.title_buttons))
+
             ## Poll for user input
             for e in pygame.event.get():
                 ## Safe quit method
@@ -355,21 +459,21 @@ class Main:
         ## Load all GUI images ##
         #########################
         
-        self.button0 = pygame.image.load("data/images/gui/button_1.png").convert_alpha()
-        self.button1 = pygame.image.load("data/images/gui/button_2.png").convert_alpha()
-        self.button2 = pygame.image.load("data/images/gui/button_3.png").convert_alpha()
-        self.savebox = pygame.image.load("data/images/gui/savebox.png").convert_alpha()
-        self.datetime = pygame.image.load("data/images/gui/widget.png").convert_alpha()
-        self.textbox = pygame.image.load("data/images/gui/textbox.png").convert_alpha()
-        self.choicebox = pygame.image.load("data/images/gui/choicebox.png").convert_alpha()
-        self.slidebar = pygame.image.load("data/images/gui/slidebar.png").convert_alpha()
-        self.slider = pygame.image.load("data/images/gui/slider.png").convert_alpha()
-        self.speedbox = pygame.image.load("data/images/gui/demobox.png").convert_alpha()
-
-        self.logo = pygame.image.load("data/images/screen/logo.png").convert()
-        self.title = pygame.image.load("data/images/screen/title_back.png").convert_alpha()
-        self.config_screen = pygame.image.load("data/images/screen/config_back.png").convert_alpha()
-        self.splash = pygame.image.load("data/images/screen/splash.png").convert_alpha()
+        self.button0 = self.load_image("data/images/gui/button_1.png")
+        self.button1 = self.load_image("data/images/gui/button_2.png")
+        self.button2 = self.load_image("data/images/gui/button_3.png")
+        self.savebox = self.load_image("data/images/gui/savebox.png")
+        self.datetime = self.load_image("data/images/gui/widget.png")
+        self.textbox = self.load_image("data/images/gui/textbox.png")
+        self.choicebox = self.load_image("data/images/gui/choicebox.png")
+        self.slidebar = self.load_image("data/images/gui/slidebar.png")
+        self.slider = self.load_image("data/images/gui/slider.png")
+        self.speedbox = self.load_image("data/images/gui/demobox.png")
+
+        self.logo = self.load_image("data/images/screen/logo.png", "convert")
+        self.title = self.load_image("data/images/screen/title_back.png")
+        self.config_screen = self.load_image("data/images/screen/config_back.png")
+        self.splash = self.load_image("data/images/screen/splash.png")
             
         self.fade_mask = pygame.Surface(self.screen_dimension)
         self.fade_mask = self.fade_mask.convert()
@@ -399,6 +503,8 @@ class Main:
         self.dialogue_font_color = (255,255,255) ## Dialogue font color
         self.dialogue_prev_color = (128,128,128) ## Dialogue backlog color
         self.dialogue_shadow_color = (0,0,0)     ## Dialogue shadow color
+        self.backlog_size = 200      ## Most textboxes kept in the backlog, 0 for no limit
+        self.rollback_size = 50      ## Most textboxes the player can roll back through
         self.textbox_topleft = (0,0) ## Textbox topleft anchor position
         self.textbox_margin = 8      ## Margin from topleft corner
         self.option_margin = 8       ## Margin from topleft corner
@@ -429,6 +535,7 @@ class Main:
 
         self.starting_scene = "000" ## Filename for starting scene
         self.main_music = "None"    ## Filename for title screen BGM
+        self.lines_per_frame = 64   ## Maximum script lines executed per frame
 
         ## Generate variables named "$aa" to "$zz"
         self.variable_strings = []
@@ -496,6 +603,16 @@ class Main:
                 temp = line.split(":")[1].split(",")
                 self.dialogue_prev_color = [int(temp[0]),int(temp[1]),int(temp[2])]
 
+            ## Number of textboxes kept in the backlog
+            elif line.startswith("backlog_size:"):
+                temp = line.split(":")[1]
+                self.backlog_size = max(0, int(temp))
+
+            ## Number of textboxes the player can roll back through
+            elif line.startswith("rollback_size:"):
+                temp = line.split(":")[1]
+                self.rollback_size = max(0, int(temp))
+
             ## Dialogue shadow color
             elif line.startswith("text_shadow:"):
                 temp = line.split(":")[1].split(",")
@@ -762,7 +879,10 @@ class Main:
             ## Savebox grid dimensions
             elif line.startswith("save_grid_dimension:"):
                 temp = line.split(":")[1].split(",")
-                self.grid_size = [int(temp[0]),int(temp[1])]
+                self.grid_size = [max(1,int(temp[0])),min(max(1,int(temp[1])),CONST.QUICK_SLOT)]
+                ## Leave the quick save slot outside of the grid
+                if self.grid_size[0] * self.grid_size[1] > CONST.QUICK_SLOT:
+                    self.grid_size[0] = CONST.QUICK_SLOT / self.grid_size[1]
 
             ## Title screen newgame button
             elif line.startswith("title_newgame:"):
@@ -824,6 +944,11 @@ class Main:
                 temp = line.split(":")[1].lstrip().rstrip()
                 self.starting_scene = temp
 
+            ## Budget of instantly-completing script lines per frame
+            elif line.startswith("lines_per_frame:"):
+                temp = line.split(":")[1]
+                self.lines_per_frame = max(1, int(temp))
+
         ## Create BGM volume control label
         new_button = Button(self.config_button_data[0][0], self.dialogue_font, self.font_antialias, self.dialogue_fontsize, self.speedbox,
                             (self.config_button_data[0][1], self.config_button_data[0][2]), -1024, color=self.dialogue_font_color,
@@ -848,7 +973,7 @@ class Main:
                             shadow=self.button_shadow_color, fadein=True, anchor="center")
         self.config_buttons.append(new_button)
 
-    def init_members(self):
+    def init_members(self, keep_music=False):
         ##########################################################
         ## Member variable initialization for in-game variables ##
         ##########################################################
@@ -867,11 +992,13 @@ class Main:
         self.cur_name_text   = None   ## Text object for current name
         self.datetime_display = None  ## Date-time widget object
         self.ingame_date     = "null" ## Date-time widget string
+        self.cur_music       = None   ## Name of the background music playing
+        self.char_banks      = {}     ## Image bank to the character loaded into it
 
-        self.prev_dialogue   = []     ## List of previous dialogue strings
         self.prev_text_index = -1     ## Index into the previous dialogue string
         self.max_prev_index  = -1     ## Maximum index at which previous dialogue occurs
-        self.prev_name_text  = []     ## List of previous name entries
+        self.backlog = Backlog(self.backlog_size) ## Previous dialogue as plain strings
+        self.rollback = Rollback(self.rollback_size) ## Snapshots of previous textboxes
         self.cur_scene       = None   ## Current scene file
         self.old_scene       = None   ## Old scene file
         self.is_process_text = False  ## Whether or not we are processing scene text
@@ -885,6 +1012,7 @@ class Main:
         self.finished_scene = False ## Whether or not we've finished the scene
         
         self.hide_alpha = 255        ## Alpha channel value for hiding GUI
+        self.textbox_layer = TextBox(self.textbox, self.textbox_topleft) ## Cached textbox layer
         self.target_hide_alpha = 255 ## Target alpha channel value
         self.has_set_hide = False    ## Whether or not we've requested a hide operation
 
@@ -894,6 +1022,7 @@ class Main:
         self.target_scale = 1.0          ## Target scale at which backgroudn image should end up
         self.zoom_rate = 0.1             ## Rate to interpolate between target_scale and zoom_scale
         self.temp_scene = None           ## Temporary scene object holder
+        self.zoom_pyramid = None         ## Keyframes of the zooming scene, if precomputed
         self.has_loaded_scene = False    ## Whether or not we've requested a load scene operation
         self.has_unloaded_scene = False  ## Whether or not we've requested a delete scene operation
 
@@ -913,805 +1042,644 @@ class Main:
         self.is_zoom_in = False  ## Whether we're zooming into a scene
         self.is_zoom_out = False ## Whether we're zooming out of a scene
 
-        pygame.mixer.music.stop() ## Force stop any accidental music playing 
+        if not keep_music:
+            pygame.mixer.music.stop() ## Force stop any accidental music playing 
         self.sound = None ## Current sound effect object
 
         self.is_comment = False ## Whether or not we've parsed a comment
+        self.awaiting_input = False ## Whether the script is blocked until the player acts
+
+        self.frame_rects = []        ## Screen regions changed this frame
+        self.frame_chars = []        ## Characters on-screen last frame
+        self.frame_signature = None  ## Scene state drawn last frame
+        self.notice = None           ## Button showing a short message, if any
+        self.notice_time = 0         ## Ticks at which the notice goes away
         self.is_process_choice = False ## Whether or not we're processing a dialogue branch choice
         
-    def interpret_line(self, line):
+    def interpret_line(self, instruction):
         ###########################################################
-        ## Meat of the engine that parses the scripting language ##
+        ## Meat of the engine that executes a compiled line of   ##
+        ## the scripting language through the opcode table       ##
         ###########################################################
-
-        ## Get rid of all comments, which can begin with a # anywhere in the lien
-        line = line.lstrip().split("#")[0].rstrip()
         self.is_comment = False
+        return self.opcodes[instruction.opcode](instruction)
 
-        ## Get rid of all comments like above
-        if len(line) == 0 and not self.is_process_text:
-            self.is_comment = True
-            return True
+    def exec_comment(self, instruction):
+        ## Blank lines inside a dialogue block are empty dialogue lines
+        if self.is_process_text:
+            return self.exec_string(instruction)
+        self.is_comment = True
+        return True
 
+    def exec_forcequit(self, instruction):
         ## Quit the game
-        elif line.startswith(".forcequit"):
-            self.running = False
-            return True
+        self.running = False
+        return True
 
+    def exec_load(self, instruction):
         ## Load a character into memory
-        elif line.startswith(".load"):
-            ## Parse out the parentheses
-            temp = line.replace(")","").split("(")[1].split(",")
-            ## If we have no parameters passed
-            if len(temp) < 2:
-                try:
-                    temp = temp[0].lstrip().rstrip()
-                    ## Clear all characters from current scene
-                    if (temp.isdigit() or temp == '-1') and int(temp) < len(self.cur_chars):
-                        clear = True
-                        ## Fade them out, then remove them from memory
-                        for char in self.cur_chars:
-                            if int(temp) == char.index or int(temp) == -1:
-                                char.alpha -= 24
-                                if char.alpha < 0:
-                                    self.cur_chars.remove(char)
-                                    char.alpha = 0
-                                else:
-                                    clear = False
-                        if clear:
-                            if int(temp) == -1:
-                                self.cur_chars = []
-                            return True
-                        return False
-                    return True
-                except:
-                    ## Raise custom exception into terminal
-                    self.raise_exception(200)
-
-            ## If we have at least one parameter passed
-            path = "data/images/char/%s/" %(temp[0].lstrip().rstrip())
+        name, bank = instruction.args
+        self.load_bank(bank, name)
+        return True
 
-            ## Attempt to load the images from the expected directory
-            for filename in glob.glob(os.path.join(path, "*.png")):
-                try:
-                    im = pygame.image.load(filename).convert_alpha()
-                    self.char_im[int(temp[1])].append(im)
-                except:
-                    ## Raise custom exception into terminal
-                    self.raise_exception(50, arg=filename)
+    def load_bank(self, bank, name):
+        ## Attempt to load a character's images from the expected directory,
+        ## replacing whatever the bank held before
+        ## The bank must be a number within the image banks
+        if bank == None:
+            self.raise_exception(200)
+        elif bank < 0 or bank >= len(self.char_im):
+            self.raise_exception(51, "bank %d" %(bank))
+        path = "data/images/char/%s/" %(name)
+        images = []
+        for filename in glob.glob(os.path.join(path, "*.png")):
+            try:
+                images.append(self.load_image(filename))
+            except:
+                ## Raise custom exception into terminal
+                self.raise_exception(50, arg=filename)
+        ## Keep the bank as it was if the character has no images
+        if len(images) == 0:
+            self.raise_exception(50, arg=os.path.join(path, "*"))
+        self.char_im[bank] = images
+        self.char_banks[bank] = name
+
+    def exec_unload(self, instruction):
+        ## Clear characters from the current scene
+        if instruction.error != None:
+            self.raise_exception(*instruction.error)
+        target = instruction.args
+        if target == None or target >= len(self.cur_chars):
+            return True
 
+        clear = True
+        ## Fade them out, then remove them from memory
+        for char in self.cur_chars:
+            if target == char.index or target == -1:
+                char.alpha -= 24
+                if char.alpha < 0:
+                    self.cur_chars.remove(char)
+                    char.alpha = 0
+                else:
+                    clear = False
+        if clear:
+            if target == -1:
+                self.cur_chars = []
             return True
+        return False
 
+    def exec_text(self, instruction):
         ## Start a line of dialogue text
-        elif line.startswith(".text"):
-            ## If we are currently processing commands, not raw text strings...
-            if not self.is_process_text:
-                ## Reset dialogue box
-                self.cur_dialogue    = []
-                self.cur_text_index  = 0
-                self.advance = False
-
-                ## Parse out the parentheses
-                temp = line.replace(")","").split("(")[1].split(",")
-                cur_char  = 0
-                cur_em    = 0
-                cur_pos   = 0
-                cur_name  = ""
-                ignore    = True
-                skip      = False
-
-                for phrase in temp:
-                    ## Parse out the parameters
-                    keywords = phrase.lstrip().rstrip().split("=")
-                    param = keywords[0].lstrip().rstrip()
-                    value = keywords[1].lstrip().rstrip()
-
-                    ## Character image bank detected
-                    if param == "char":
-                        ignore = False
-                        try:
-                            cur_char = int(value)
-                        except:
-                            ## Raise custom exception
-                            self.raise_exception(101)
-
-                    ## Specific character image detected
-                    elif param == "sub":
-                        try:
-                            cur_em = int(value)
-                        except:
-                            ## Raise custom exception
-                            self.raise_exception(102)
-
-                    ## Character horizontal pos detected
-                    elif param == "pos":
-                        try:
-                            cur_pos = int(value)
-                        except:
-                            ## Raise custom exception
-                            self.raise_exception(103)
-
-                    ## Character name detected
-                    elif param == "name":
-                        cur_name = value
-
-                    ## No character detected
-                    elif param == "skip":
-                        skip = True
-
-                ## If any of the above parameters were supplied...
-                if not ignore:
-                    try:
-                        ## Load character image
-                        temp = self.char_im[cur_char][cur_em]
-                    except:
-                        ## Raise exception if character image not found
-                        if not self.char_im[cur_char] or cur_char > len(self.char_im) - 1:
-                            self.raise_exception(51, str(cur_char))
-                        elif cur_em > len(self.char_im[cur_char]) - 1:
-                            self.raise_exception(52, str(cur_em))
-
-                    ## Calculate x-pos
-                    pos  = [cur_pos * self.screen_dimension[0]/16, self.screen_dimension[1]]
-
-                    ## Don't draw a new character if he/she is currently in the scene
-                    if len(self.cur_chars) == 0:
-                        add_new = True
-                    elif self.cur_chars[-1].em != cur_em or self.cur_chars[-1].name != cur_name or self.cur_chars[-1].pos != pos:
-                        add_new = True
-                    else:
-                        add_new = False
-
-                    ## Don't draw a new character if he/she is currently in the scene
-                    if add_new:
-                        new_char = Character(temp, cur_em, pos, cur_name, cur_char, cur_pos)
-                        self.cur_chars.append(new_char)
-                        if len(self.cur_chars) > 8:
-                            self.cur_chars = self.cur_chars[1:]
-
-                ## If we have new text to put into the buffer...
-                if not skip:
-                    ## Add the current text into the previous text buffer
-                    self.prev_dialogue.append([])
+        ## If we are currently processing commands, not raw text strings...
+        if not self.is_process_text:
+            if instruction.error != None:
+                self.raise_exception(*instruction.error)
+            args = instruction.args
+            self.rollback.push(self.get_state(self.index).flatten())
+            self.read_log.mark(self.index)
+
+            ## Reset dialogue box
+            self.cur_dialogue    = []
+            self.cur_text_index  = 0
+            self.advance = False
+
+            cur_char = args["char"]
+            cur_em   = args["sub"]
+            cur_pos  = args["pos"]
+            cur_name = args["name"]
+
+            ## If any of the above parameters were supplied...
+            if not args["ignore"]:
+                try:
+                    ## Load character image
+                    temp = self.char_im[cur_char][cur_em]
+                except:
+                    ## Raise exception if character image not found
+                    if cur_char > len(self.char_im) - 1 or not self.char_im[cur_char]:
+                        self.raise_exception(51, str(cur_char))
+                    elif cur_em > len(self.char_im[cur_char]) - 1:
+                        self.raise_exception(52, str(cur_em))
+
+                ## Calculate x-pos
+                pos  = [cur_pos * self.screen_dimension[0]/16, self.screen_dimension[1]]
+
+                ## Don't draw a new character if he/she is currently in the scene
+                if len(self.cur_chars) == 0:
+                    add_new = True
+                elif self.cur_chars[-1].em != cur_em or self.cur_chars[-1].name != cur_name or self.cur_chars[-1].pos != pos:
+                    add_new = True
+                else:
+                    add_new = False
+
+                ## Don't draw a new character if he/she is currently in the scene
+                if add_new:
+                    new_char = Character(temp, cur_em, pos, cur_name, cur_char, cur_pos)
+                    self.cur_chars.append(new_char)
+                    if len(self.cur_chars) > 8:
+                        self.cur_chars = self.cur_chars[1:]
+
+            ## If we have new text to put into the buffer...
+            if not args["skip"]:
+                ## Add the current text into the previous text buffer,
+                ## shifting the indices if the oldest entry was dropped
+                if not self.backlog.add(cur_name):
                     self.prev_text_index += 1
                     self.max_prev_index += 1
 
-                    ## Set up the text objects to be displayed on-screen
-                    pos = [self.textbox_margin, self.textbox_margin + self.cur_text_index * self.dialogue_fontsize]
-                    name_text = Text(cur_name, self.dialogue_font, self.font_antialias, pos, self.dialogue_fontsize, self.dialogue_font_color,
-                                     self.dialogue_shadow_color, False, shadow_type=2)
+                ## Set up the text objects to be displayed on-screen
+                pos = [self.textbox_margin, self.textbox_margin + self.cur_text_index * self.dialogue_fontsize]
+                name_text = Text(cur_name, self.dialogue_font, self.font_antialias, pos, self.dialogue_fontsize, self.dialogue_font_color,
+                                 self.dialogue_shadow_color, False, shadow_type=2)
 
-                    self.cur_name_text = name_text
-                    self.prev_name_text.append(name_text)
+                self.cur_name_text = name_text
 
-                ## Start processing raw strings
-                self.is_process_text = True
-            
-            else:
-                ## If we encountered a terminator command...
-                if not self.is_skip and not self.is_auto:
-                    self.state = STATE.READ ## Allow player to pause and read
-                self.cur_text_index = 0
-                if not self.advance:
-                    return False
-                self.advance = False
-                self.is_process_text = False
-                
-            return True
+            ## Start processing raw strings
+            self.is_process_text = True
+
+        else:
+            ## If we encountered a terminator command...
+            if not self.is_skip and not self.is_auto:
+                self.state = STATE.READ ## Allow player to pause and read
+            self.cur_text_index = 0
+            if not self.advance:
+                self.awaiting_input = True
+                return False
+            self.advance = False
+            self.is_process_text = False
+
+        return True
 
+    def exec_wait(self, instruction):
         ## Wait a few frames before proceeding with game
-        elif line.startswith(".wait"):
-            ## Parse out parameters
-            temp = line.replace(")","").split("(")[1]
-            if not self.has_set_wait:
-                try:
-                    self.wait_count = int(temp)
-                except:
-                    self.raise_exception(104)
-                self.has_set_wait = True
-
-            ## Tick down the counter
-            self.wait_count -= 1
-            if self.wait_count <= 0:
-                self.wait_count = 0
-                self.has_set_wait = False
-                return True
-            return False
+        if not self.has_set_wait:
+            if instruction.error != None:
+                self.raise_exception(*instruction.error)
+            self.wait_count = instruction.args
+            self.has_set_wait = True
+        ## Skipping ignores waits
+        if self.is_skip:
+            self.wait_count = 0
+
+        ## Tick down the counter
+        self.wait_count -= 1
+        if self.wait_count <= 0:
+            self.wait_count = 0
+            self.has_set_wait = False
+            return True
+        return False
 
+    def exec_shake(self, instruction):
         ## Shake screen in either X or Y axis
-        elif line.startswith(".shake"):
-            ## parse Out parameters
-            temp = line.replace(")","").split("(")
-            ## Turn off shaking if empty parameters supplied
-            if len(temp) < 2:
-                self.is_shake = False
-                self.shake_range = [0,0]
-                return True
-
-            ## Continue shaking otherwise
-            self.is_shake = True
-            try:
-                temp = temp[1].split(",")
-                self.shake_range = [int(temp[0]), int(temp[1])]
-            except:
-                self.raise_exception(105)
-                
+        ## Turn off shaking if empty parameters supplied
+        if instruction.args == None:
+            self.is_shake = False
+            self.shake_range = [0,0]
             return True
 
+        ## Continue shaking otherwise
+        self.is_shake = True
+        if instruction.error != None:
+            self.raise_exception(*instruction.error)
+        self.shake_range = list(instruction.args)
+        return True
+
+    def exec_choice(self, instruction):
         ## Start a branching dialogue options section
-        elif line.startswith(".choice"):
-            ## If we're not processing choices currently
-            if not self.is_process_choice:
-                self.state = STATE.READ
-                self.advance = False
-                self.cur_options = []
-                self.cur_choice = -1
-                self.is_process_choice = True
-            else:
-                ## Processing choices until we jump to the correct branch
-                self.state = STATE.CHOOSE
-                if self.cur_choice == -1:
-                    return False
-                self.is_process_choice = False
-                self.state = STATE.READ
-                self.advance = False
-            return True
+        ## If we're not processing choices currently
+        if not self.is_process_choice:
+            self.rollback.push(self.get_state(self.index).flatten())
+            self.state = STATE.READ
+            self.advance = False
+            self.cur_options = []
+            self.cur_choice = -1
+            self.is_process_choice = True
+        else:
+            ## Processing choices until we jump to the correct branch
+            self.state = STATE.CHOOSE
+            if self.cur_choice == -1:
+                self.awaiting_input = True
+                return False
+            self.is_process_choice = False
+            self.state = STATE.READ
+            self.advance = False
+        return True
 
-        ## If we are processing choices, seek until the correct branch is found
-        elif len(line) >= 2 and line[0].isdigit() and self.is_process_choice:
-            temp = line.split(":")
-            text = temp[1].lstrip().rstrip()
-            pos = [self.screen_dimension[0]/2, (len(self.cur_options)+1)*int(self.choicebox.get_height()*1.2) + self.screen_dimension[1]/8]
-            choice = Choice(text, self.dialogue_font, self.font_antialias, self.choicebox, int(temp[0]), pos)
-            self.cur_options.append(choice)
-            return True
+    def exec_option(self, instruction):
+        ## Only treat the line as an option while processing choices
+        if not self.is_process_choice:
+            return self.exec_string(instruction)
+        value, text = instruction.args
+        pos = [self.screen_dimension[0]/2, (len(self.cur_options)+1)*int(self.choicebox.get_height()*1.2) + self.screen_dimension[1]/8]
+        choice = Choice(text, self.dialogue_font, self.font_antialias, self.choicebox, value, pos)
+        self.cur_options.append(choice)
+        return True
 
+    def exec_branch(self, instruction):
         ## Choice branch conditional statement
-        elif line.startswith(".branch"):
+        if instruction.args != None:
+            if instruction.error != None:
+                self.raise_exception(*instruction.error)
+            if instruction.args == self.cur_choice:
+                self.cur_choice = -1
+                return True
+            ## Jump straight to the matching terminator
+            self.state = STATE.OPT_BRANCH
+            self.index = self.script.jumps[self.index] - 1
+        else:
+            self.state = STATE.READ
 
-            ## Parse out the parameters before the colon
-            temp = line.replace(":","").lstrip().rstrip().split(" ")
-            if len(temp) > 1:
-                try:
-                    if int(temp[1]) == self.cur_choice:
-                        self.cur_choice = -1
-                        return True
-                    self.state = STATE.OPT_BRANCH
-                except:
-                    ## Raise custom exception
-                    self.raise_exception(106)
-            else:
-                self.state = STATE.READ
-                
-            return True
+        return True
 
+    def exec_setanchor(self, instruction):
         ## Set anchoring position for zooming in and out
-        elif line.startswith(".setanchor"):
-            temp = line.replace(")","").split("(")[1].lstrip().rstrip()
-            self.new_anchor = self.anchors[temp]
-            self.new_anchor_string = temp
-            return True
+        if instruction.args not in self.anchors:
+            self.raise_exception(250)
+        self.new_anchor = self.anchors[instruction.args]
+        self.new_anchor_string = instruction.args
+        return True
 
-        ## Transition into a scene image
-        elif line.startswith(".scenein"):
-            if not self.has_loaded_scene:
-                ## Parse out parameters
-                temp = line.replace(")","").split("(")[1].split(",")
-                if len(temp) < 2:
-                    ## Raise exception
-                    self.raise_exception(200)
-                folder = temp[0].lstrip().rstrip()
-                file   = temp[1].lstrip().rstrip()
-
-                ## If we have at least as many parameters as required
-                if len(temp) > 2:
-                    type = temp[2].lstrip().rstrip()
-                    ## Fade in the image
-                    if type == "fade":
-                        self.is_fade_in = True
-                    ## Zoom in the image
-                    elif type == "zoomin":
-                        self.is_zoom_in = True
-                        ## Allow for zoom scale, target scale, and zoom rate
-                        ## to be supplied as optional parameters
-                        if len(temp) > 3:
-                            scale = temp[3].lstrip().rstrip() 
-                            try:
-                                self.zoom_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 4:
-                            scale = temp[4].lstrip().rstrip() 
-                            try:
-                                self.target_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 5:
-                            rate = temp[5].lstrip().rstrip() 
-                            try:
-                                self.zoom_rate = float(rate)
-                            except:
-                                self.raise_exception(100)
-                    ## Zoom out the image
-                    elif type == "zoomout":
-                        self.is_zoom_out = True
-                        ## Allow zoom scale, zoom rate, and target scale
-                        ## to be supplied as optional parameters
-                        if len(temp) > 3:
-                            scale = temp[3].lstrip().rstrip() 
-                            try:
-                                self.zoom_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 4:
-                            scale = temp[4].lstrip().rstrip() 
-                            try:
-                                self.target_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 5:
-                            rate = temp[5].lstrip().rstrip() 
-                            try:
-                                self.zoom_rate = float(rate)
-                            except:
-                                self.raise_exception(100)
-                    ## Combination fade and zoom in
-                    elif type == "fadezoomin":
-                        self.is_fade_in = True
-                        self.is_zoom_in = True
-                        if len(temp) > 3:
-                            scale = temp[3].lstrip().rstrip() 
-                            try:
-                                self.zoom_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 4:
-                            scale = temp[4].lstrip().rstrip() 
-                            try:
-                                self.target_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 5:
-                            rate = temp[5].lstrip().rstrip() 
-                            try:
-                                self.zoom_rate = float(rate)
-                            except:
-                                self.raise_exception(100)
-                    ## Combination fade and zoom out
-                    elif type == "fadezoomout":
-                        self.is_fade_in = True
-                        self.is_zoom_out = True
-                        if len(temp) > 3:
-                            scale = temp[3].lstrip().rstrip() 
-                            try:
-                                self.zoom_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 4:
-                            scale = temp[4].lstrip().rstrip() 
-                            try:
-                                self.target_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 5:
-                            rate = temp[5].lstrip().rstrip() 
-                            try:
-                                self.zoom_rate = float(rate)
-                            except:
-                                self.raise_exception(100)
+    def set_transition(self, args, is_in):
+        ########################################################
+        ## Sets up the fade and zoom flags for a transition,  ##
+        ## allowing zoom scale, target scale, and zoom rate   ##
+        ## to be supplied as optional parameters              ##
+        ########################################################
+        kind = args["type"]
+        if kind in ("fade", "fadezoomin", "fadezoomout"):
+            if is_in:
+                self.is_fade_in = True
+            else:
+                self.is_fade_out = True
+        if kind in ("zoomin", "fadezoomin"):
+            self.is_zoom_in = True
+        elif kind in ("zoomout", "fadezoomout"):
+            self.is_zoom_out = True
+
+        if args["zoom_scale"] != None:
+            self.zoom_scale = args["zoom_scale"]
+        if args["target_scale"] != None:
+            self.target_scale = args["target_scale"]
+        if args["zoom_rate"] != None:
+            self.zoom_rate = args["zoom_rate"]
+
+    def scale_scene(self, scale):
+        ##########################################################
+        ## Returns the transition scene at the given scale,     ##
+        ## cropped to the part that lands on-screen at the      ##
+        ## current anchor. Only the source pixels under the     ##
+        ## window are scaled, so the cost follows the window    ##
+        ## size instead of the zoom. The crop keeps the anchor  ##
+        ## point of the full scaled scene, so it is blitted     ##
+        ## the same way                                         ##
+        ##########################################################
+        ## Scale from the nearest precomputed keyframe instead, if any
+        image = self.temp_scene
+        if self.zoom_pyramid != None:
+            image, base = self.zoom_pyramid.get(scale)
+            scale = scale / base
+        dim = (image.get_width(), image.get_height())
+        full = pygame.Rect(0, 0, int(dim[0]*scale), int(dim[1]*scale))
+        setattr(full, self.new_anchor_string, self.new_anchor)
+        visible = full.clip(pygame.Rect((0,0), self.screen_dimension))
+        if visible.width == 0 or visible.height == 0:
+            return pygame.transform.scale(image, full.size)
+
+        ## Whole source pixels covering the visible part
+        left   = int(math.floor((visible.left - full.left) / scale))
+        top    = int(math.floor((visible.top - full.top) / scale))
+        right  = min(dim[0], int(math.ceil((visible.right - full.left) / scale)))
+        bottom = min(dim[1], int(math.ceil((visible.bottom - full.top) / scale)))
+        source = pygame.Rect(left, top, max(1, right - left), max(1, bottom - top))
+        scaled = pygame.transform.scale(image.subsurface(source),
+                                        (int(round(source.width*scale)), int(round(source.height*scale))))
+
+        ## Trim the partly visible source pixels at the edges, keeping
+        ## the fade alpha, which subsurfaces do not inherit
+        offset = (visible.left - full.left - int(round(left*scale)), visible.top - full.top - int(round(top*scale)))
+        cropped = scaled.subsurface(pygame.Rect(offset, visible.size).clip(scaled.get_rect()))
+        cropped.set_alpha(self.temp_scene.get_alpha())
+        return cropped
+
+    def start_zoom(self):
+        ##########################################################
+        ## Starts precomputing keyframes of the transition      ##
+        ## scene on a worker thread, if enabled and the zoom    ##
+        ## reaches half scale. Above that, a frame scales at    ##
+        ## most four times the pixels it draws anyway           ##
+        ##########################################################
+        self.stop_zoom()
+        low = min(self.zoom_scale, self.target_scale)
+        if self.zoom_out_keyframes and (self.is_zoom_in or self.is_zoom_out) and low <= 0.5:
+            self.zoom_pyramid = ZoomPyramid(self.temp_scene, low)
+
+    def stop_zoom(self):
+        ##########################################################
+        ## Drops the keyframes of a finished zoom, stopping the ##
+        ## worker if it is still building them                  ##
+        ##########################################################
+        if self.zoom_pyramid != None:
+            self.zoom_pyramid.cancel()
+            self.zoom_pyramid = None
+
+    def step_zoom(self):
+        ##########################################################
+        ## Advances a zoom transition by one frame; returns     ##
+        ## whether or not the zoom is still in progress         ##
+        ##########################################################
+        ## Skipping jumps straight to the end of the zoom
+        rate = abs(self.target_scale - self.zoom_scale) if self.is_skip else self.zoom_rate
+        if self.is_zoom_in:
+            ## Zoom in the scene for real
+            if self.zoom_scale < self.target_scale:
+                self.zoom_scale = min(self.target_scale, self.zoom_scale + rate)
                 try:
-                    ## Fade scenes over one another
-                    if self.cur_scene != None:
-                        self.old_scene = self.cur_scene.copy().convert()
-                    self.cur_scene = pygame.image.load("data/images/%s/%s.png" %(folder,file)).convert()
-                    self.cur_scene_file = [folder, file]
-                    self.has_loaded_scene = True
-
-                    self.temp_scene = self.cur_scene.copy().convert()
-                    
+                    self.cur_scene = self.scale_scene(self.zoom_scale)
                 except:
-                    ## Raise custom exception
-                    self.raise_exception(50)
-
-            pre_done = False ## Variable to manage zooming and fading states
-            if self.is_fade_in:
-                ## Fade in the scene for real
-                if self.fade_alpha < 255:
-                    self.fade_alpha += self.fade_rate
-                    self.temp_scene.set_alpha(self.fade_alpha)
-                    self.cur_scene = self.temp_scene
-                    pre_done = True
-                if not pre_done:
-                    self.is_fade_in = False
-                    self.fade_alpha = 0
-            if self.is_zoom_in:
-                ## Zoom in the scene for real
-                if self.zoom_scale < self.target_scale:
-                    dim = (self.temp_scene.get_width(), self.temp_scene.get_height())
-                    self.zoom_scale = min(self.target_scale, self.zoom_scale + self.zoom_rate)
-                    try:
-                        self.cur_scene = pygame.transform.scale(self.temp_scene, (int(dim[0]*self.zoom_scale), int(dim[1]*self.zoom_scale)))
-                    except:
-                        self.raise_exception(90)
-                    pre_done = True
-                if not pre_done:
-                    self.is_zoom_in = False
-                    self.zoom_scale = 1.0
-                    self.target_scale = 1.0
-                    self.zoom_rate = 0.1
-            elif self.is_zoom_out:
-                ## Zoom out the scene for real
-                if self.zoom_scale > self.target_scale:
-                    dim = (self.temp_scene.get_width(), self.temp_scene.get_height())
-                    self.zoom_scale = max(self.target_scale, self.zoom_scale - self.zoom_rate)
-                    try:
-                        self.cur_scene = pygame.transform.scale(self.temp_scene, (int(dim[0]*self.zoom_scale), int(dim[1]*self.zoom_scale)))
-                    except:
-                        self.raise_exception(90)
-                    pre_done = True
-                if not pre_done:
-                    self.is_zoom_out = False
-                    self.zoom_scale = 1.0
-                    self.target_scale = 1.0
-                    self.zoom_rate = 0.1
-
-            if pre_done:
-                ## If we aren't done zooming in or fading in, don't change the scene
-                return False
+                    self.raise_exception(90)
+                return True
+            self.is_zoom_in = False
+            self.stop_zoom()
+            self.zoom_scale = 1.0
+            self.target_scale = 1.0
+            self.zoom_rate = 0.1
+        elif self.is_zoom_out:
+            ## Zoom out the scene for real
+            if self.zoom_scale > self.target_scale:
+                self.zoom_scale = max(self.target_scale, self.zoom_scale - rate)
+                try:
+                    self.cur_scene = self.scale_scene(self.zoom_scale)
+                except:
+                    self.raise_exception(90)
+                return True
+            self.is_zoom_out = False
+            self.stop_zoom()
+            self.zoom_scale = 1.0
+            self.target_scale = 1.0
+            self.zoom_rate = 0.1
+        return False
 
-            ## We're done loading the scene, change it in memory
-            self.has_loaded_scene = False
-            if self.old_scene != None:
-                self.old_scene.set_alpha(0)
-            
-            self.has_set_auto = False
-            return True
+    def exec_scenein(self, instruction):
+        ## Transition into a scene image
+        if not self.has_loaded_scene:
+            if instruction.error != None:
+                self.raise_exception(*instruction.error)
+            args = instruction.args
+            self.set_transition(args, True)
+            try:
+                ## Fade scenes over one another
+                if self.cur_scene != None:
+                    self.old_scene = self.cur_scene.copy().convert()
+                self.cur_scene = self.load_image("data/images/%s/%s.png" %(args["folder"],args["file"]), "convert")
+                self.cur_scene_file = [args["folder"], args["file"]]
+                self.has_loaded_scene = True
 
-        ## Transition out of a scene
-        elif line.startswith(".sceneout"):
-            if not self.has_unloaded_scene:
-                ## Parse out parentheses
-                temp = line.replace(")","").split("(")[1].split(",")
-                if len(temp) > 0:
-                    ## If we have enough parameters...
-                    type = temp[0].lstrip().rstrip()
-                    ## Fade out a scene
-                    if type == "fade":
-                        self.is_fade_out = True
-                    ## Zoom in to transition out
-                    elif type == "zoomin":
-                        self.is_zoom_in = True
-                        if len(temp) > 1:
-                            scale = temp[1].lstrip().rstrip() 
-                            try:
-                                self.zoom_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 2:
-                            scale = temp[2].lstrip().rstrip() 
-                            try:
-                                self.target_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 3:
-                            rate = temp[3].lstrip().rstrip() 
-                            try:
-                                self.zoom_rate = float(rate)
-                            except:
-                                self.raise_exception(100)
-                    ## Zoom out to transition out
-                    elif type == "zoomout":
-                        self.is_zoom_out = True
-                        if len(temp) > 1:
-                            scale = temp[1].lstrip().rstrip() 
-                            try:
-                                self.zoom_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 2:
-                            scale = temp[2].lstrip().rstrip() 
-                            try:
-                                self.target_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 3:
-                            rate = temp[3].lstrip().rstrip() 
-                            try:
-                                self.zoom_rate = float(rate)
-                            except:
-                                self.raise_exception(100)
-                    ## Combination fade and zoom in
-                    elif type == "fadezoomin":
-                        self.is_fade_out = True
-                        self.is_zoom_in = True
-                        if len(temp) > 1:
-                            scale = temp[1].lstrip().rstrip() 
-                            try:
-                                self.zoom_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 2:
-                            scale = temp[2].lstrip().rstrip() 
-                            try:
-                                self.target_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 3:
-                            rate = temp[3].lstrip().rstrip() 
-                            try:
-                                self.zoom_rate = float(rate)
-                            except:
-                                self.raise_exception(100)
-                    ## Combination fade and zoom out
-                    elif type == "fadezoomout":
-                        self.is_fade_out = True
-                        self.is_zoom_out = True
-                        if len(temp) > 1:
-                            scale = temp[1].lstrip().rstrip() 
-                            try:
-                                self.zoom_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 2:
-                            scale = temp[2].lstrip().rstrip() 
-                            try:
-                                self.target_scale = float(scale)
-                            except:
-                                self.raise_exception(100)
-                        if len(temp) > 3:
-                            rate = temp[3].lstrip().rstrip() 
-                            try:
-                                self.zoom_rate = float(rate)
-                            except:
-                                self.raise_exception(100)
-                    
                 self.temp_scene = self.cur_scene.copy().convert()
-                self.has_unloaded_scene = True
-            
-            pre_done = False ## Don't delete scene if we're not done transitioning out
-            if self.is_fade_out:
-                ## Fade out for real
-                if self.fade_alpha < 255:
-                    self.fade_alpha += self.fade_rate
-                    self.temp_scene.set_alpha(255-self.fade_alpha)
-                    self.cur_scene = self.temp_scene
-                    pre_done = True
-                if not pre_done:
-                    self.is_fade_out = False
-                    self.fade_alpha = 0
-            if self.is_zoom_in:
-                ## Zoom in for real
-                if self.zoom_scale < self.target_scale:
-                    dim = (self.temp_scene.get_width(), self.temp_scene.get_height())
-                    self.zoom_scale = min(self.target_scale, self.zoom_scale + self.zoom_rate)
-                    try:
-                        self.cur_scene = pygame.transform.scale(self.temp_scene, (int(dim[0]*self.zoom_scale), int(dim[1]*self.zoom_scale)))
-                    except:
-                        self.raise_exception(90)
-                    pre_done = True
-                if not pre_done:
-                    self.is_zoom_in = False
-                    self.zoom_scale = 1.0
-                    self.target_scale = 1.0
-                    self.zoom_rate = 0.1
-            elif self.is_zoom_out:
-                ## ZOom out for real
-                if self.zoom_scale > self.target_scale:
-                    dim = (self.temp_scene.get_width(), self.temp_scene.get_height())
-                    self.zoom_scale = max(self.target_scale, self.zoom_scale - self.zoom_rate)
-                    try:
-                        self.cur_scene = pygame.transform.scale(self.temp_scene, (int(dim[0]*self.zoom_scale), int(dim[1]*self.zoom_scale)))
-                    except:
-                        self.raise_exception(90)
-                    pre_done = True
-                if not pre_done:
-                    self.is_zoom_out = False
-                    self.zoom_scale = 1.0
-                    self.target_scale = 1.0
-                    self.zoom_rate = 0.1
-
-            if pre_done:
-                ## Not done transitioning, don't continue
-                return False
+                self.start_zoom()
 
-            ## Continue with scene file processing
-            self.has_unloaded_scene = False
-            self.has_set_auto = False
-            return True
+            except:
+                ## Raise custom exception
+                self.raise_exception(50)
+
+        pre_done = False ## Variable to manage zooming and fading states
+        if self.is_fade_in:
+            ## Fade in the scene for real
+            if self.fade_alpha < 255:
+                self.fade_alpha += 255 if self.is_skip else self.fade_rate
+                self.temp_scene.set_alpha(self.fade_alpha)
+                self.cur_scene = self.temp_scene
+                pre_done = True
+            if not pre_done:
+                self.is_fade_in = False
+                self.fade_alpha = 0
+        if self.step_zoom():
+            pre_done = True
+
+        if pre_done:
+            ## If we aren't done zooming in or fading in, don't change the scene
+            return False
 
+        ## We're done loading the scene, change it in memory and
+        ## let go of the surfaces only the transition needed
+        self.has_loaded_scene = False
+        self.old_scene = None
+        self.temp_scene = None
+
+        self.has_set_auto = False
+        return True
+
+    def exec_sceneout(self, instruction):
+        ## Transition out of a scene
+        if not self.has_unloaded_scene:
+            if instruction.error != None:
+                self.raise_exception(*instruction.error)
+            self.set_transition(instruction.args, False)
+            self.temp_scene = self.cur_scene.copy().convert()
+            self.start_zoom()
+            self.has_unloaded_scene = True
+
+        pre_done = False ## Don't delete scene if we're not done transitioning out
+        if self.is_fade_out:
+            ## Fade out for real
+            if self.fade_alpha < 255:
+                self.fade_alpha += 255 if self.is_skip else self.fade_rate
+                self.temp_scene.set_alpha(255-self.fade_alpha)
+                self.cur_scene = self.temp_scene
+                pre_done = True
+            if not pre_done:
+                self.is_fade_out = False
+                self.fade_alpha = 0
+        if self.step_zoom():
+            pre_done = True
+
+        if pre_done:
+            ## Not done transitioning, don't continue
+            return False
+
+        ## Continue with scene file processing
+        self.has_unloaded_scene = False
+        self.temp_scene = None
+        self.has_set_auto = False
+        return True
+
+    def exec_music(self, instruction):
         ## Load or stop a piece of background music
-        elif line.startswith(".music"):
-            ## Parse out the parentheses
-            temp = line.replace(")","").split("(")[1].lstrip().rstrip()
-            if len(temp) == 0:
-                ## Empty parameters means stop music
-                pygame.mixer.music.stop()
-            else:
-                ## Attempt to load a wav file
-                try:
-                    pygame.mixer.music.load("data/music/" + temp + ".wav")
-                    pygame.mixer.music.set_volume(self.volume)
-                    pygame.mixer.music.play(-1)
-                except:
-                    ## Raise custom exception
-                    self.raise_exception(55, temp)
-            return True
+        if len(instruction.args) == 0:
+            ## Empty parameters means stop music
+            pygame.mixer.music.stop()
+            self.cur_music = None
+        else:
+            self.cur_music = instruction.args
+            ## Attempt to load a wav file
+            try:
+                pygame.mixer.music.load("data/music/" + instruction.args + ".wav")
+                pygame.mixer.music.set_volume(self.volume)
+                pygame.mixer.music.play(-1)
+            except:
+                ## Raise custom exception
+                self.raise_exception(55, instruction.args)
+        return True
 
-        ## Load or stop a sound effect wav
-        elif line.startswith(".sound") and not self.is_skip:
-            ## Parse out parentheses
-            temp = line.replace(")","").split("(")[1].lstrip().rstrip()
-            if len(temp) > 0:
-                ## Full parameters means attempt to load wav
-                try:
-                    self.sound = pygame.mixer.Sound("data/sound/" + temp + ".wav")
-                    self.sound.set_volume(self.slider_values[1])
-                    self.sound.play()
-                except:
-                    ## raise custom exception
-                    self.raise_exception(56, temp)
-            else:
-                ## Empty parameters means stop sound effect
-                self.sound.stop()
-                self.sound = None
+    def exec_sound(self, instruction):
+        ## Load or stop a sound effect wav, unless we are skipping
+        if self.is_skip:
             return True
+        if len(instruction.args) > 0:
+            ## Full parameters means attempt to load wav
+            try:
+                path = "data/sound/" + instruction.args + ".wav"
+                self.sound = self.prefetcher.take(path)
+                if self.sound == None:
+                    self.sound = pygame.mixer.Sound(path)
+                self.sound.set_volume(self.slider_values[1])
+                self.sound.play()
+            except:
+                ## raise custom exception
+                self.raise_exception(56, instruction.args)
+        elif self.sound != None:
+            ## Empty parameters means stop sound effect
+            self.sound.stop()
+            self.sound = None
+        return True
 
+    def exec_setfade(self, instruction):
         ## Set fade rate
-        elif line.startswith(".setfade"):
-            temp = line.replace(")","").split("(")[1].lstrip().rstrip()
-            self.fade_rate = int(temp)
-            return True
+        if instruction.error != None:
+            self.raise_exception(*instruction.error)
+        self.fade_rate = instruction.args
+        return True
 
+    def exec_hide(self, instruction):
         ## Hide GUI buttons and text box
-        elif line.startswith(".hide"):
-            if not self.has_set_hide:
-                self.has_set_hide = True
-                self.target_hide_alpha = 0
-            if self.hide_alpha > self.target_hide_alpha:
-                self.hide_alpha -= 15
-                if self.hide_alpha < 0:
-                    self.hide_alpha = 0
-                return False
-            self.has_set_hide = False
-            return True
+        if not self.has_set_hide:
+            self.has_set_hide = True
+            self.target_hide_alpha = 0
+        if self.hide_alpha > self.target_hide_alpha:
+            self.hide_alpha -= 255 if self.is_skip else 15
+            if self.hide_alpha < 0:
+                self.hide_alpha = 0
+            return False
+        self.has_set_hide = False
+        return True
 
+    def exec_show(self, instruction):
         ## Show GUI buttons and text box
-        elif line.startswith(".show"):
-            if not self.has_set_hide:
-                self.has_set_hide = True
-                self.target_hide_alpha = 255
-            if self.hide_alpha < self.target_hide_alpha:
-                self.hide_alpha += 15
-                if self.hide_alpha > 255:
-                    self.hide_alpha = 255
-                return False
-            self.has_set_hide = False
-            return True
+        if not self.has_set_hide:
+            self.has_set_hide = True
+            self.target_hide_alpha = 255
+        if self.hide_alpha < self.target_hide_alpha:
+            self.hide_alpha += 255 if self.is_skip else 15
+            if self.hide_alpha > 255:
+                self.hide_alpha = 255
+            return False
+        self.has_set_hide = False
+        return True
 
+    def exec_swap(self, instruction):
         ## Swap the current scene file with a new one
-        elif line.startswith(".swap"):
-            temp = line.replace(")","").split("(")[1].lstrip().rstrip()
-            self.run_scene(temp, False)
-            return True
+        self.run_scene(instruction.args, False)
+        return True
 
+    def exec_widget(self, instruction):
         ## Create a date-time indicator widget
-        elif line.startswith(".widget"):
-            temp = line.replace(")","").split("(")[1].split(",")
-            if len(temp) < 2:
-                self.raise_exception(200)
-            self.ingame_date = temp[0].lstrip().rstrip()
-            anchor = temp[1].lstrip().rstrip()
-            if anchor not in ("topleft","midtop","topright","midleft","center","midright","bottomleft","midbottom","bottomright"):
-                self.raise_exception(250)
-            self.datetime_display = Button(self.ingame_date, self.button_font, self.font_antialias, self.datetime_fontsize, self.datetime,
-                                           self.datetime_topleft, -1, True, anchor=anchor, shadow_type=2)
-            return True
+        if instruction.error != None:
+            self.raise_exception(*instruction.error)
+        self.ingame_date, anchor = instruction.args
+        self.datetime_display = Button(self.ingame_date, self.button_font, self.font_antialias, self.datetime_fontsize, self.datetime,
+                                       self.datetime_topleft, -1, True, anchor=anchor, shadow_type=2)
+        return True
 
+    def exec_variable(self, instruction):
         ## Do a variable manipulation command
-        elif line.startswith("$"):
-            try:
-                if "+" in line:
-                    ## Increment a variable via +=
-                    temp = line.split("+=")
-                    var   = temp[0].lstrip().rstrip()
-                    value = temp[1].lstrip().rstrip()
-                    if value.isdigit():
-                        value = int(value)
-                        self.variables[var] += value
-                    else:
-                        self.variables[var] += self.variables[value]
-                elif "-" in line:
-                    ## Decrement a variable via -=
-                    temp = line.split("-=")
-                    var   = temp[0].lstrip().rstrip()
-                    value = temp[1].lstrip().rstrip()
-                    if value.isdigit():
-                        value = int(value)
-                        self.variables[var] -= value
-                    else:
-                        self.variables[var] -= self.variables[value]
-                elif "=" in line:
-                    ## Assign to a variable via =
-                    temp = line.split("=")
-                    var   = temp[0].lstrip().rstrip()
-                    value = temp[1].lstrip().rstrip()
-                    if value.isdigit():
-                        value = int(value)
-                        self.variables[var] = value
-                    else:
-                        self.variables[var] = self.variables[value]
-            except:
-                ## Raise custom exception
-                self.raise_exception(150)
+        if instruction.error != None:
+            self.raise_exception(*instruction.error)
+        if instruction.args == None:
             return True
+        var, op, value = instruction.args
+        try:
+            ## Allow for variable-constant and intervariable operands
+            if isinstance(value, str):
+                value = self.variables[value]
+            if op == "+=":
+                ## Increment a variable via +=
+                self.variables[var] += value
+            elif op == "-=":
+                ## Decrement a variable via -=
+                self.variables[var] -= value
+            else:
+                ## Assign to a variable via =
+                self.variables[var] = value
+        except:
+            ## Raise custom exception
+            self.raise_exception(150)
+        return True
 
+    def exec_if(self, instruction):
         ## Compare variables for boolean result
-        elif line.startswith(".if"):
-            temp = line.split(" ")
-            if len(temp) > 1:
-                try:
-                    var  = self.variables[temp[1].lstrip().rstrip()]
-                    comp = temp[3].replace(":","").rstrip()
-                    ## Allow for intervariable and variable-constant comparisons
-                    if comp.isdigit():
-                        comparison = int(comp)
-                    else:
-                        comparison = self.variables[comp]
-                except:
-                    self.raise_exception(150)
+        if instruction.args == None:
+            self.state = STATE.READ
+            return True
+        if instruction.error != None:
+            self.raise_exception(*instruction.error)
+
+        name, op, comp = instruction.args
+        try:
+            var = self.variables[name]
+            ## Allow for intervariable and variable-constant comparisons
+            if isinstance(comp, str):
+                comparison = self.variables[comp]
             else:
-                self.state = STATE.READ
+                comparison = comp
+        except:
+            self.raise_exception(150)
+
+        ## Less than
+        if op == "<":
+            if var < comparison:
                 return True
 
-            ## Less than
-            op = temp[2].lstrip().rstrip()
-            if op == "<":
-                if var < comparison:
-                    return True
+        ## Less than or equals
+        elif op == "<=":
+            if var <= comparison:
+                return True
 
-            ## Less than or equals
-            elif op == "<=":
-                if var <= comparison:
-                    return True
+        ## Greater than
+        elif op == ">":
+            if var > comparison:
+                return True
 
-            ## Greater than
-            elif op == ">":
-                if var > comparison:
-                    return True
+        ## Greater than or equals
+        elif op == ">=":
+            if var >= comparison:
+                return True
 
-            ## Greater than or equals
-            elif op == ">=":
-                if var >= comparison:
-                    return True
+        ## Equals
+        elif op == "==":
+            if var == comparison:
+                return True
 
-            ## Equals
-            elif op == "==":
-                if var == comparison:
-                    return True
+        ## Does not equal
+        elif op == "!=":
+            if var != comparison:
+                return True
 
-            ## Does not equal
-            elif op == "!=":
-                if var != comparison:
-                    return True
-                
-            self.state = STATE.VAR_BRANCH
-            return True
+        ## Jump straight to the matching terminator
+        self.state = STATE.VAR_BRANCH
+        self.index = self.script.jumps[self.index] - 1
+        return True
 
+    def exec_string(self, instruction):
         ## Read in and scroll out a piece of dialogue
-        elif self.state == STATE.READ and self.is_process_text:
-            pos = [self.textbox_margin * 8, self.textbox_margin + (self.cur_text_index + 1) * self.dialogue_fontsize]
-            text = line.lstrip().rstrip()
-            text = Text(text, self.dialogue_font, self.font_antialias, pos, self.dialogue_fontsize, self.dialogue_font_color,
-                        self.dialogue_shadow_color, scrollable=True, scroll_speed=self.scroll_speed, shadow_type=2)
-            self.cur_dialogue.append(text)
-            self.cur_text_index += 1
-
-            text = line.lstrip().rstrip()
-            text = Text(text, self.dialogue_font, self.font_antialias, pos, self.dialogue_fontsize, self.dialogue_prev_color, self.dialogue_shadow_color, False,
-                        shadow_type=2)
-            self.prev_dialogue[self.prev_text_index].append(text)
+        if not (self.state == STATE.READ and self.is_process_text):
             return True
-
+        pos = [self.textbox_margin * 8, self.textbox_margin + (self.cur_text_index + 1) * self.dialogue_fontsize]
+        text = Text(instruction.line, self.dialogue_font, self.font_antialias, pos, self.dialogue_fontsize, self.dialogue_font_color,
+                    self.dialogue_shadow_color, scrollable=True, scroll_speed=self.scroll_speed, shadow_type=2)
+        ## Skipped dialogue is shown whole instead of scrolling out
+        if self.is_skip:
+            text.cur_width = text.width
+        self.cur_dialogue.append(text)
+        self.cur_text_index += 1
+        self.backlog.add_line(instruction.line)
         return True
 
     def raise_exception(self, num, arg=None):
@@ -1750,12 +1718,16 @@ class Main:
             raise Exception("VNError (Line %d in %s.nes): Shake magnitude was not an integer pair!" %(self.index+1, self.cur_file))
         elif num == 106:
             raise Exception("VNError (Line %d in %s.nes): Branch label was not an integer!" %(self.index+1, self.cur_file))
+        elif num == 107:
+            raise Exception("VNError (Line %d in %s.nes): Fade rate was not an integer!" %(self.index+1, self.cur_file))
         elif num == 150:
             raise Exception("VNError (Line %d in %s.nes): Referenced a nonexistent variable!" %(self.index+1, self.cur_file))
         elif num == 200:
             raise Exception("VNError (Line %d in %s.nes): Not enough arguments supplied for the function!" %(self.index+1, self.cur_file))
         elif num == 250:
             raise Exception("VNError (Line %d in %s.nes): Anchor position was not recognized!" %(self.index+1, self.cur_file))
+        elif num == 300:
+            raise Exception("VNError: Save file format version '%s' is not supported!\n\tPerhaps it was written by a newer engine?" %(arg))
         
 
     def draw_buttons(self):
@@ -1841,131 +1813,28 @@ class Main:
                 else:
                     button.update(color=self.button_font_color)
                     button.has_sound_played = False
-                button.draw(self.screen)
+                if button.draw(self.screen):
+                    self.mark_dirty(button.rect)
 
     def run_save(self):
         #################################
         ## Write data into a save file ##
         #################################
         
-        temp_index = self.index
-        found_text = 0
-        ## Iterate backwards into the scene file until the beginning of a dialogue is found 
-        while temp_index > 0:
-            if self.lines[temp_index].lstrip().startswith(".text"):
-                found_text += 1
-                if found_text == 2:
-                    break
-            temp_index -= 1
-
-        ## Create the save string to write to the save file
-        save_string = u"begin\n"
-        ## Concatenate relevant information
-        for i in range(len(self.prev_dialogue)):
-            ## Concatenate speaker's name
-            save_string += "name: %s\n" %(self.prev_name_text[i].string.rstrip())
-            ## Concatenate dialogue strings
-            for j in range(len(self.prev_dialogue[i])):
-                save_string += "%s\n" %(self.prev_dialogue[i][j].string)
-        ## Concatenate scene index, background indices, text indices, et cetera
-        save_string += "end\n\nscene: %s\nindex: %03d\n" %(self.cur_file, temp_index)
-        save_string += "background: %s, %s\n" %(self.cur_scene_file[0], self.cur_scene_file[1])
-        save_string += "text_index: %d, %d\n" %(self.max_prev_index, self.max_prev_index)
-
-        ## Allow for Unicode recording
-        date = self.ingame_date.decode('utf-8')
-        ## Concatenate what the date-time widget says
-        save_string += u"widget: {}\n".format(date)
-
-        for var in self.variable_strings:
-            ## Record all nonzero variables
-            if self.variables[var] != 0:
-                save_string += "nonzero_var: %s, %d\n" %(var, self.variables[var])
-
-        ## Record music filename
-        music_index = self.index
-        while not (self.lines[music_index].lstrip().startswith(".music")) and music_index > 0:
-            music_index -= 1
-        if self.lines[music_index].lstrip().startswith(".music"):
-            temp = self.lines[music_index].lstrip().split("#")[0].rstrip()
-            temp = temp.split("(")[1].rstrip(")").lstrip().rstrip()
-            if len(temp) > 0:
-                save_string += "music: %s\n" %(temp)
-
-        ## Record whether we were shaking the screen at the time
-        anim_index = self.index
-        while not(self.lines[anim_index].lstrip().startswith(".shake")) and anim_index > 0:
-            anim_index -= 1
-        if self.lines[anim_index].lstrip().startswith(".shake"):
-            temp = self.lines[anim_index].lstrip().split("#")[0].rstrip()
-            temp = temp.replace(")","").split("(")[1].split(",")
-            if len(temp) > 1:
-                save_string += "shake: %d, %d\n" %(int(temp[0]), int(temp[1]))
-
-        ## Record characters as they are found (max 4)
-        char_index = self.index
-        char_exist_count = 0
-        char_found_count = 0
-        for i in range(4):
-            if len(self.char_im[i]) > 0:
-                char_exist_count += 1
-
-        ## Record characters
-        while char_found_count < char_exist_count:
-            char_index -= 1
-            if char_index < 0:
-                break
-            elif self.lines[char_index].lstrip().startswith(".load"):
-                temp = self.lines[char_index].lstrip().split("#")[0].rstrip()
-                temp = temp.replace(")","").split("(")[1].split(",")
-                if len(temp) > 1:
-                    save_string += "load: %s, %d\n" %(temp[0], int(temp[1]))
-                    char_found_count += 1
+        ## Snapshot the runtime state as the fields to save after the backlog
+        fields = self.serializer.get_fields(self.get_state(self.get_resume_index()))
 
-        for char in self.cur_chars:
-            save_string += "draw: %d, %d, %d, %s\n" %(char.index, char.em, char.num, char.name)
-
-        ## Calculate the save directory and actually write to the file
-        path = "data/data/"
-        self.save_buttons = []
-        save_positions = []
-        ## Generate a list of save files already in the directory
-        for filename in glob.glob(os.path.join(path, "*.jsav")):
-            x, y = 0, 0
-            save_file = open(filename, "r").readlines()
-            total = self.grid_size[1] * x + y
-            label = "Empty File"
-            for line in save_file:
-                if line.startswith("xy"):
-                    temp = line.split(":")[1].split(",")
-                    x, y = int(temp[0]), int(temp[1])
-                elif line.startswith("datetime"):
-                    total = self.grid_size[1] * x + y
-                    label = "Save %02d: " %(total+1) + line.split(":")[1].lstrip().rstrip() + ":" + line.split(":")[2].lstrip().rstrip()
-            pos = [self.save_list_pos[0] + int(self.savebox.get_width() * 1.05) * x,
-                   self.save_list_pos[1] + self.savebox.get_height() * y]
-            button = Button(label, self.button_font, self.font_antialias, self.button0_fontsize, self.savebox, pos, total, sfx=self.button_sound, ping=self.select_sound,
-                                    color=self.button_font_color, shadow=self.button_shadow_color, hover=self.button_hover_color, fadein=True)
-            self.save_buttons.append(button)
-            save_positions.append((x,y))
-
-        ## Draw the save files as buttons on-screen
-        for i in range(self.grid_size[0]):
-            for j in range(self.grid_size[1]):
-                if (i,j) not in save_positions:
-                    pos = [self.save_list_pos[0] + int(self.savebox.get_width() * 1.05) * i,
-                           self.save_list_pos[1] + self.savebox.get_height() * j]
-                    total = self.grid_size[1] * i + j
-                    label = "Empty File"
-                    button = Button(label, self.button_font,  self.font_antialias, self.button0_fontsize, self.savebox, pos, total, sfx=self.button_sound, ping=self.select_sound,
-                                    color=self.button_font_color, shadow=self.button_shadow_color, hover=self.button_hover_color, fadein=True)
-                    self.save_buttons.append(button)
-                    save_positions.append((i,j))
+        ## Lay out the save slots as buttons on-screen
+        self.save_buttons, save_positions = self.get_slot_buttons(True)
 
         button = Button("Back", self.button_font, self.font_antialias, self.button0_fontsize, self.button0, self.to_title_pos, -1, sfx=self.button_sound, ping=self.select_sound,
                                     color=self.button_font_color, shadow=self.button_shadow_color, hover=self.button_hover_color, fadein=True)
         self.save_buttons.append(button)
 
+        ## Copy the backlog, which keeps growing while saves are written
+        backlog = self.backlog.snapshot()
+        saving = {} ## Button index to (slot, label) of saves being written
+
         old_state = self.state
         self.state = STATE.SAVE
         self.save_index = 0
@@ -1974,6 +1843,15 @@ class Main:
         ## Sub game loop to allow players to choose a save slot to save into
         while not done:
             self.clock.tick(60) ## 60 FPS
+
+            ## Relabel the slots whose saves have finished writing
+            for i in list(saving):
+                total, label = saving[i]
+                if not self.save_writer.is_pending(total):
+                    if self.save_writer.get_error(total) != None:
+                        label = "Save %02d: Failed" %(total+1)
+                    self.save_buttons[i].update(string=label)
+                    del saving[i]
             
             self.screen.blit(self.title, (0,0)) ## Blit title background image
 
@@ -1981,6 +1859,9 @@ class Main:
                 
             pygame.display.flip() ## Refresh screen buffer
 
+            ## Sleep until input once the save slots have faded in
+            self.wait_for_input(self.is_menu_idle(self.save_buttons) and len(saving) == 0)
+
             ## Poll for input
             for e in pygame.event.get():
                 ## Allow for easy exiting
@@ -1993,7 +1874,7 @@ class Main:
                 elif e.type == pygame.MOUSEBUTTONDOWN:
                     ## Handle buttons and concatenate relevant save data information
                     if self.handle_buttons():
-                        save_string += "xy: %d, %d\n" %(save_positions[self.save_index])
+                        xy = save_positions[self.save_index]
                         dt = datetime.datetime.today()
                         year = dt.year
                         month = dt.month
@@ -2001,19 +1882,19 @@ class Main:
                         hour = dt.hour
                         minute = dt.minute
                         ## Date-time will be used as the label for the save button
-                        save_string += "datetime: %d-%d-%d, %02d:%02d\n" %(year,month,day,hour,minute)
+                        stamp = "%d-%d-%d, %02d:%02d" %(year,month,day,hour,minute)
 
-                        total = save_positions[self.save_index][0] * self.grid_size[1] + save_positions[self.save_index][1]
-                        ## Write to a utf-8 encoded file
-                        savefile = codecs.open("data/data/%03d.jsav" %(total), "w+", "utf-8")
-                        savefile.write(save_string)
-                        savefile.close()
+                        total = xy[0] * self.grid_size[1] + xy[1]
+                        ## Stream the save file out and update the slot index in the background
+                        chunks = self.serializer.dump(backlog, fields + [("xy", "%d, %d" %(xy)), ("datetime", stamp)])
+                        self.save_writer.write(total, xy[0], xy[1], stamp, chunks)
 
                         pos = [self.save_list_pos[0] + int(self.savebox.get_width() * 1.05) * save_positions[self.save_index][0],
                                self.save_list_pos[1] + self.savebox.get_height() * save_positions[self.save_index][1]]
-                        ## Date-time will be used as the label for the save button
+                        ## Date-time will be used as the label for the save button once it is written
                         label = "Save %02d: %d-%d-%d, %02d:%02d" %(total+1,year,month,day,hour,minute)
-                        self.save_buttons[self.save_index] = Button(label, self.button_font, self.font_antialias, self.button0_fontsize,
+                        saving[self.save_index] = (total, label)
+                        self.save_buttons[self.save_index] = Button("Save %02d: Saving..." %(total+1), self.button_font, self.font_antialias, self.button0_fontsize,
                                                                     self.savebox, pos, total, sfx=self.button_sound, ping=self.select_sound,
                                                                     color=self.button_font_color, shadow=self.button_shadow_color,
                                                                     hover=self.button_hover_color, fadein=True)
@@ -2023,43 +1904,219 @@ class Main:
         self.state = old_state
         return True
 
-    def run_load(self):
-        ##################################
-        ## Read data out of a save file ##
-        ##################################
-        path = "data/data/"
-        self.load_buttons = []
-        load_positions = []
-        for filename in glob.glob(os.path.join(path, "*.jsav")):
-            x, y = 0, 0
-            load_file = open(filename, "r").readlines()
-            total = self.grid_size[1] * x + y
-            label = "Empty File"
-            for line in load_file:
-                if line.startswith("xy:"):
-                    temp = line.split(":")[1].split(",")
-                    x, y = int(temp[0]), int(temp[1])
-                elif line.startswith("datetime"):
-                    total = self.grid_size[1] * x + y
-                    label = "Save %02d: " %(total+1) + line.split(":")[1].lstrip().rstrip() + ":" + line.split(":")[2].lstrip().rstrip()
-            pos = [self.save_list_pos[0] + int(self.savebox.get_width() * 1.05) * x,
-                   self.save_list_pos[1] + self.savebox.get_height() * y]
-            button = Button(label, self.button_font, self.font_antialias, self.button0_fontsize, self.savebox, pos, total, sfx=self.button_sound, ping=self.select_sound,
-                                color=self.button_font_color, shadow=self.button_shadow_color, hover=self.button_hover_color, fadein=True)
-            self.load_buttons.append(button)
-            load_positions.append((x,y))
+    def get_resume_index(self):
+        ##########################################################
+        ## Returns the script index a save resumes from, the    ##
+        ## start of the dialogue on screen                      ##
+        ##########################################################
+        temp_index = self.index
+        found_text = 0
+        ## Iterate backwards into the scene file until the beginning of a dialogue is found 
+        while temp_index > 0:
+            if self.script[temp_index].opcode == OP.TEXT:
+                found_text += 1
+                if found_text == 2:
+                    break
+            temp_index -= 1
+        return temp_index
+
+    def run_quick_save(self):
+        ##########################################################
+        ## Snapshots the game into memory. It is written to the ##
+        ## quick save slot later, once the scene is idle        ##
+        ##########################################################
+        dt = datetime.datetime.today()
+        stamp = "%d-%d-%d, %02d:%02d" %(dt.year,dt.month,dt.day,dt.hour,dt.minute)
+        self.quick_save = (self.get_state(self.get_resume_index()), self.backlog.snapshot(), stamp)
+        self.quick_pending = True
+
+    def write_quick_save(self):
+        ##########################################################
+        ## Queues the quick save for writing if it has changed  ##
+        ## since it was last written                            ##
+        ##########################################################
+        if not self.quick_pending:
+            return
+        state, backlog, stamp = self.quick_save
+        fields = self.serializer.get_fields(state) + [("xy", "-1, -1"), ("datetime", stamp)]
+        self.save_writer.write(CONST.QUICK_SLOT, -1, -1, stamp, self.serializer.dump(backlog, fields))
+        self.quick_pending = False
+
+    def run_quick_load(self):
+        ##########################################################
+        ## Restores the quick save straight from memory, or     ##
+        ## from its save slot if none was made this session     ##
+        ##########################################################
+        if self.quick_save == None:
+            ## Nothing in memory, so fall back on the slot an earlier session wrote
+            self.save_writer.flush()
+            if CONST.QUICK_SLOT in self.saves.list_slots():
+                self.load_save(CONST.QUICK_SLOT)
+            else:
+                self.show_notice("No quick save")
+            return
+        state, entries, stamp = self.quick_save
+
+        ## The dialogue on screen is added again once its line executes
+        backlog = Backlog(self.backlog_size)
+        for name, lines in entries[:-1]:
+            backlog.add(name)
+            for line in lines:
+                backlog.add_line(line)
+        state = state.copy()
+        state.backlog_count = backlog.first + len(backlog)
+
+        self.backlog = backlog
+        self.rollback.clear()
+        self.restore_state(state)
+
+    def show_notice(self, string):
+        ##########################################################
+        ## Shows a message in the top-right corner of the       ##
+        ## screen for CONST.NOTICE_TIME milliseconds            ##
+        ##########################################################
+        pos = (self.screen.get_width() - self.datetime.get_width(), 0)
+        self.notice = Button(string, self.button_font, self.font_antialias, self.datetime_fontsize, self.datetime, pos, -1,
+                             fadein=True, shadow_type=2)
+        self.notice_time = pygame.time.get_ticks() + CONST.NOTICE_TIME
+
+    def get_state(self, index):
+        ##########################################################
+        ## Returns a copy of the runtime state, to resume the   ##
+        ## scene from the given script index                    ##
+        ##########################################################
+        banks = {}
+        for bank in self.char_banks:
+            ## Only record banks that still hold images
+            if len(self.char_im[bank]) > 0:
+                banks[bank] = self.char_banks[bank]
+        chars = [(char.index, char.em, char.num, char.name) for char in self.cur_chars]
+        shake = tuple(self.shake_range) if self.is_shake else None
+        return GameState(self.cur_file, index, self.max_prev_index, list(self.cur_scene_file), self.cur_music, shake,
+                         banks, chars, self.ingame_date, dict(self.variables), self.backlog.first + len(self.backlog),
+                         self.target_hide_alpha, self.fade_rate, self.new_anchor_string)
+
+    def restore_state(self, state):
+        ##########################################################
+        ## Puts the interpreter back into a recorded runtime    ##
+        ## state, reusing the compiled scene, loaded banks and  ##
+        ## cached images wherever they are unchanged            ##
+        ##########################################################
+        old_im, old_banks, old_music = self.char_im, self.char_banks, self.cur_music
+        backlog, rollback = self.backlog, self.rollback
+        self.init_members(state.music == old_music)
+        self.backlog, self.rollback = backlog, rollback
+
+        if state.scene != self.cur_file:
+            try:
+                self.lines = open("data/scenes/%s.nes" %(state.scene), "r").readlines()
+            except:
+                self.raise_exception(0, state.scene)
+            self.script = Script(self.lines)
+            self.cur_file = state.scene
+            self.read_log.open_scene(self.cur_file, len(self.script))
+            self.prefetcher.reset()
+        self.index = state.index
+
+        ## Drop the dialogue that came after the state
+        self.backlog.truncate(state.backlog_count)
+        self.prev_text_index = len(self.backlog) - 1
+        self.max_prev_index  = len(self.backlog) - 1
+
+        ## GUI visibility, fade rate and anchor as the script last set them
+        self.hide_alpha = state.hide_alpha
+        self.target_hide_alpha = state.hide_alpha
+        self.fade_rate = state.fade_rate
+        self.new_anchor = self.anchors[state.anchor]
+        self.old_anchor = self.anchors[state.anchor]
+        self.new_anchor_string = state.anchor
+        self.old_anchor_string = state.anchor
+
+        if state.background[0] != "null":
+            self.cur_scene = self.load_image("data/images/%s/%s.png" %(state.background[0], state.background[1]), "convert")
+            self.cur_scene_file = list(state.background)
+
+        self.cur_music = state.music
+        if state.music != None and state.music != old_music:
+            pygame.mixer.music.load("data/music/" + state.music + ".wav")
+            pygame.mixer.music.set_volume(self.volume)
+            pygame.mixer.music.play(-1)
+
+        if state.shake != None:
+            self.is_shake = True
+            self.shake_range = list(state.shake)
 
+        for bank in state.banks:
+            if old_banks.get(bank) == state.banks[bank]:
+                self.char_im[bank] = old_im[bank]
+                self.char_banks[bank] = state.banks[bank]
+            else:
+                self.load_bank(bank, state.banks[bank])
+
+        for index, em, num, name in state.chars:
+            pos = [num * self.screen_dimension[0]/16, self.screen_dimension[1]]
+            self.cur_chars.append(Character(self.char_im[index][em], em, pos, name, index, num))
+
+        self.set_date_widget(state.widget)
+        self.variables.update(state.variables)
+
+    def run_rollback(self):
+        ##########################################################
+        ## Rewinds the scene to the start of the previous       ##
+        ## textbox or choice                                    ##
+        ##########################################################
+        if len(self.rollback) < 2:
+            return
+        ## The newest snapshot is the textbox on screen, and the one before
+        ## it is recorded again once its line executes after the restore
+        self.rollback.pop()
+        self.restore_state(GameState.unflatten(self.rollback.pop()))
+
+    def set_date_widget(self, date):
+        ##########################################################
+        ## Sets the date-time widget text, or hides the widget  ##
+        ## if it is "null"                                      ##
+        ##########################################################
+        self.ingame_date = date
+        if date != "null":
+            self.datetime_display = Button("%s" %(date), self.button_font, self.font_antialias, self.datetime_fontsize, self.datetime, self.datetime_topleft, -1,
+                                           True, shadow_type=2)
+        else:
+            self.datetime_display = None
+
+    def get_slot_buttons(self, is_save):
+        ##########################################################
+        ## Returns a button for every save slot on the grid,    ##
+        ## labelled from the slot index, along with each        ##
+        ## button's grid position. Empty slots can only be      ##
+        ## selected when saving                                 ##
+        ##########################################################
+        buttons = []
+        positions = []
+        self.save_writer.flush()
+        slots = self.saves.list_slots()
         for i in range(self.grid_size[0]):
             for j in range(self.grid_size[1]):
-                if (i,j) not in load_positions:
-                    pos = [self.save_list_pos[0] + int(self.savebox.get_width() * 1.05) * i,
-                           self.save_list_pos[1] + self.savebox.get_height() * j]
-                    total = self.grid_size[1] * i + j
+                pos = [self.save_list_pos[0] + int(self.savebox.get_width() * 1.05) * i,
+                       self.save_list_pos[1] + self.savebox.get_height() * j]
+                total = self.grid_size[1] * i + j
+                if total in slots and slots[total][2] != None:
+                    label = "Save %02d: %s" %(total+1, slots[total][2])
+                    num = total
+                else:
                     label = "Empty File"
-                    button = Button(label, self.button_font, self.font_antialias, self.button0_fontsize, self.savebox, pos, -1, sfx=self.button_sound, ping=self.select_sound,
-                                    color=self.button_font_color, shadow=self.button_shadow_color, hover=self.button_hover_color, fadein=True)
-                    self.load_buttons.append(button)
-                    load_positions.append((i,j))
+                    num = total if is_save else -1
+                button = Button(label, self.button_font, self.font_antialias, self.button0_fontsize, self.savebox, pos, num, sfx=self.button_sound, ping=self.select_sound,
+                                color=self.button_font_color, shadow=self.button_shadow_color, hover=self.button_hover_color, fadein=True)
+                buttons.append(button)
+                positions.append((i,j))
+        return buttons, positions
+
+    def run_load(self):
+        ##################################
+        ## Read data out of a save file ##
+        ##################################
+        self.load_buttons, load_positions = self.get_slot_buttons(False)
 
         button = Button("Back", self.button_font, self.font_antialias, self.button0_fontsize, self.button0, self.to_title_pos, -1, sfx=self.button_sound, ping=self.select_sound,
                                     color=self.button_font_color, shadow=self.button_shadow_color, hover=self.button_hover_color, fadein=True)
@@ -2077,6 +2134,8 @@ class Main:
                 
             pygame.display.flip()
 
+            self.wait_for_input(self.is_menu_idle(self.load_buttons))
+
             for e in pygame.event.get():
                 if e.type == pygame.QUIT:
                     self._quit()
@@ -2095,93 +2154,72 @@ class Main:
 
     def load_save(self, num):
         self.init_members()
-        save_file = open("data/data/%03d.jsav" %(num)).readlines()
+        self.save_writer.flush()
+        save_file = self.saves.read(num)
+        ## Saves of older formats load as they are, but newer ones are refused
+        if self.serializer.get_version(save_file) not in SaveSerializer.VERSIONS:
+            self.raise_exception(300, arg=save_file[0].split(":", 1)[1].lstrip().rstrip())
+        backlog, fields = self.serializer.load(save_file)
+
         scene = 0
-        for i in range(len(save_file)):
-            if save_file[i].startswith("begin"):
-                while not save_file[i].startswith("end"):
-                    i += 1
-                    if save_file[i].startswith("name"):
-                        self.cur_text_index = 0
-                        temp = save_file[i].split(":")[1].lstrip().rstrip()
-                        pos = [self.textbox_margin, self.textbox_margin + self.cur_text_index * self.dialogue_fontsize]
-                        temp = Text(temp, self.dialogue_font, self.font_antialias, pos, self.dialogue_fontsize,
-                                    self.dialogue_font_color, self.dialogue_shadow_color, False, shadow_type=2)
-                        self.prev_name_text.append(temp)
-                        self.prev_dialogue.append([])
-                    elif save_file[i].startswith("end"):
-                        self.prev_name_text.remove(self.prev_name_text[-1])
-                        self.prev_dialogue.remove(self.prev_dialogue[-1])
-                        break
-                    else:
-                        temp = save_file[i].lstrip().rstrip()
-                        pos = [self.textbox_margin * 8, self.textbox_margin + (self.cur_text_index + 1) * self.dialogue_fontsize]
-                        temp = Text(temp, self.dialogue_font, self.font_antialias, pos, self.dialogue_fontsize,
-                                    self.dialogue_prev_color, self.dialogue_shadow_color, False, shadow_type=2)
-                        self.prev_dialogue[-1].append(temp)
-                        self.cur_text_index += 1
-
-            elif save_file[i].startswith("scene"):
-                temp = save_file[i].split(":")[1].lstrip().rstrip()
-                scene = temp
-            elif save_file[i].startswith("shake"):
-                temp = save_file[i].split(":")[1].split(",")
+        dropped = 0 ## Saved backlog entries over the backlog's cap
+        for name, lines in backlog:
+            if self.backlog.add(name):
+                dropped += 1
+            for line in lines:
+                self.backlog.add_line(line)
+        ## The dialogue on screen is added again once its line executes
+        if len(self.backlog) > 0:
+            self.backlog.pop()
+
+        for key, value in fields:
+            if key == "scene":
+                scene = value
+            elif key == "shake":
+                temp = value.split(",")
                 self.shake_range = [int(temp[0]), int(temp[1])]
                 if int(temp[0]) != 0 or int(temp[1]) != 0:
                     self.is_shake = True
-            elif save_file[i].startswith("music"):
-                temp = save_file[i].split(":")[1].lstrip().rstrip()
-                if temp != "None":
-                    pygame.mixer.music.load("data/music/" + temp + ".wav")
+            elif key == "music":
+                if value != "None":
+                    pygame.mixer.music.load("data/music/" + value + ".wav")
                     pygame.mixer.music.set_volume(self.volume)
                     pygame.mixer.music.play(-1)
-            elif save_file[i].startswith("background"):
-                temp = save_file[i].split(":")[1].split(",")
+                    self.cur_music = value
+            elif key == "background":
+                temp = value.split(",")
                 if temp[0].lstrip().rstrip() == "null" and temp[1].lstrip().rstrip() == "null":
                     self.cur_scene = None
                     self.old_scene = None
                 else:
                     self.old_scene = None
-                    self.cur_scene = pygame.image.load("data/images/%s/%s.png" %(temp[0].lstrip().rstrip(), temp[1].lstrip().rstrip())).convert()
-                    self.cur_scene_file = [temp[0], temp[1]]
-            elif save_file[i].startswith("index"):
-                temp = save_file[i].split(":")[1].lstrip().rstrip()
-                self.index = int(temp)
-            elif save_file[i].startswith("text_index"):
-                temp = save_file[i].split(":")[1].split(",")
-                self.prev_text_index = int(temp[0]) - 1
-                self.max_prev_index  = int(temp[1]) - 1
-            elif save_file[i].startswith("widget"):
-                temp = save_file[i].split(":")[1].lstrip().rstrip()
-                date = temp
-                if date != "null":
-                    self.ingame_date = date
-                    text = "%s" %(temp)
-                    self.datetime_display = Button(text, self.button_font, self.font_antialias, self.datetime_fontsize, self.datetime, self.datetime_topleft, -1,
-                                                   True, shadow_type=2)
-                else:
-                    self.ingame_date = date
-                    self.datetime_display = None
-                    
-            elif save_file[i].startswith("load"):
-                temp = save_file[i].split(":")[1].split(",")
-                path = "data/images/char/%s/" %(temp[0].lstrip().rstrip())
-
-                for filename in glob.glob(os.path.join(path, "*.png")):
-                    im = pygame.image.load(filename).convert_alpha()
-                    self.char_im[int(temp[1])].append(im)
-                    
-            elif save_file[i].startswith("draw"):
-                temp = save_file[i].split(":")[1].split(",")
+                    self.cur_scene = self.load_image("data/images/%s/%s.png" %(temp[0].lstrip().rstrip(), temp[1].lstrip().rstrip()), "convert")
+                    self.cur_scene_file = [temp[0].lstrip().rstrip(), temp[1].lstrip().rstrip()]
+            elif key == "index":
+                self.index = int(value)
+            elif key == "text_index":
+                ## Older formats record the index twice
+                temp = value.split(",")
+                self.prev_text_index = int(temp[0]) - 1 - dropped
+                self.max_prev_index  = int(temp[-1]) - 1 - dropped
+            elif key == "widget":
+                self.set_date_widget(value)
+
+            elif key == "load":
+                temp = value.split(",")
+                self.load_bank(int(temp[1]), temp[0].lstrip().rstrip())
+
+            elif key == "draw":
+                temp = value.split(",")
                 im = self.char_im[int(temp[0])][int(temp[1])]
                 pos  = [int(temp[2]) * self.screen_dimension[0]/16, self.screen_dimension[1]]
-                new_char = Character(im, int(temp[1]), pos, temp[3].rstrip(), int(temp[0]), int(temp[2]))
+                new_char = Character(im, int(temp[1]), pos, temp[3].lstrip().rstrip(), int(temp[0]), int(temp[2]))
                 self.cur_chars.append(new_char)
                 if len(self.cur_chars) > 8:
                     self.cur_chars = self.cur_chars[1:]
-                    
-            elif save_file[i].startswith("nonzero_var"):
-                temp = save_file[i].split(":")[1].split(",")
+
+            elif key == "nonzero_var":
+                temp = value.split(",")
                 self.variables[temp[0].lstrip().rstrip()] = int(temp[1])
 
         self.fade_alpha = 0
@@ -2215,6 +2253,9 @@ class Main:
             if pygame.event.get_grab():
                 pygame.event.set_grab(False)
 
+            ## Sliders are dragged with the mouse held down, which sends motion events
+            self.wait_for_input(self.is_menu_idle(self.config_sliders + self.config_buttons))
+
             for e in pygame.event.get():
                 if e.type == pygame.QUIT:
                     self._quit()
@@ -2260,6 +2301,40 @@ class Main:
                 else:
                     self.advance = False
 
+    def run_fast_forward(self):
+        ##########################################################
+        ## Runs the script in a tight loop without drawing for  ##
+        ## up to CONST.SKIP_REDRAW milliseconds. Dialogue moves ##
+        ## on as soon as it is read in, while waits and         ##
+        ## transitions finish at once. Stops at unread          ##
+        ## dialogue or a choice, and hands input back to the    ##
+        ## game loop                                            ##
+        ##########################################################
+        end = pygame.time.get_ticks() + CONST.SKIP_REDRAW
+        while self.running and not self.finished_scene and pygame.time.get_ticks() < end:
+            if pygame.event.peek((pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN)):
+                return
+            ## Leave dialogue the player has never seen to scroll out as usual
+            instruction = self.script[self.index]
+            if instruction.opcode == OP.TEXT and not self.is_process_text and not self.read_log.is_read(self.index):
+                self.is_skip = False
+                return
+            if not self.interpret_line(instruction):
+                if self.state == STATE.CHOOSE:
+                    self.is_skip = False
+                    return
+                ## Dialogue waiting on the player, so move on from it
+                if self.awaiting_input:
+                    self.awaiting_input = False
+                    self.prev_text_index = self.max_prev_index
+                    self.advance = True
+                ## Anything else blocking is run again until it finishes
+                continue
+            self.index += 1
+            if self.index >= len(self.lines):
+                self.index = len(self.lines) - 1
+                self.finished_scene = True
+
     def run_next(self):
         if self.prev_text_index == self.max_prev_index:
             complete = True
@@ -2451,57 +2526,198 @@ class Main:
                         self.is_skip = True if not self.is_skip and not self.is_auto else False
                     elif button.value == 7:
                         self.is_auto = True if not self.is_auto and not self.is_skip else False
-                            
+
+                    ## Sub-menus draw over the whole display, so the next
+                    ## scene frame has to be pushed whole
+                    if button.value in (0, 1, 2):
+                        self.frame_signature = None
                     return True
         return False
 
     def draw_dialogue(self):
+        self.draw_characters(self.screen)
+        if self.hide_alpha > 0:
+            if self.datetime_display != None:
+                self.draw_widget(self.screen)
+            self.draw_textbox(self.screen)
+
+    def draw_characters(self, surface):
         for i in range(len(self.cur_chars)):
-            self.cur_chars[i].draw(self.screen)
+            if self.cur_chars[i].draw(surface):
+                self.mark_dirty(self.cur_chars[i].rect)
 
-        if self.hide_alpha > 0:
+    def draw_widget(self, surface):
+        self.datetime_display.alpha = self.hide_alpha
+        if self.datetime_display.draw(surface):
+            self.mark_dirty(self.datetime_display.rect)
+
+    def draw_notice(self, surface):
+        if self.notice.draw(surface):
+            self.mark_dirty(self.notice.rect)
+
+    def draw_textbox(self, surface):
+        ## The textbox layer only recomposites when its contents change
+        if self.prev_text_index == self.max_prev_index:
+            rebuilt = self.textbox_layer.draw(surface, self.cur_name_text, self.cur_dialogue, self.hide_alpha, scroll=True)
+        else:
+            name_text, lines = self.backlog.get_page(self.prev_text_index, self.render_backlog_page)
+            rebuilt = self.textbox_layer.draw(surface, name_text, lines, self.hide_alpha)
+        if rebuilt:
+            self.mark_dirty(self.textbox_layer.rect)
+
+    def draw_choices(self, surface):
+        for option in self.cur_options:
+            if option.rect.collidepoint(self.get_mouse_pos()):
+                option.update(color=self.button_hover_color)
+            else:
+                option.update(color=self.button_font_color)
+            if option.draw(surface):
+                self.mark_dirty(option.rect)
+
+    def compose_frame(self, old_rect, new_rect):
+        ##########################################################
+        ## Draws the scene, characters and interface as layers  ##
+        ## of the compositor, which leaves out the ones that    ##
+        ## cannot be seen                                       ##
+        ##########################################################
+        layers = self.compositor
+        if self.old_scene != None:
+            alpha = self.old_scene.get_alpha()
+            layers.add("background-old", lambda surface: surface.blit(self.old_scene, old_rect), old_rect,
+                       255 if alpha == None else alpha, Compositor.is_opaque(self.old_scene))
+        if self.cur_scene != None:
+            alpha = self.cur_scene.get_alpha()
+            layers.add("background-new", lambda surface: surface.blit(self.cur_scene, new_rect), new_rect,
+                       255 if alpha == None else alpha, Compositor.is_opaque(self.cur_scene))
+
+        if self.state in (STATE.READ, STATE.CHOOSE, STATE.OPT_BRANCH, STATE.VAR_BRANCH):
+            if len(self.cur_chars) > 0:
+                rect = self.cur_chars[0].rect.unionall([char.rect for char in self.cur_chars])
+                layers.add("characters", self.draw_characters, rect)
             if self.datetime_display != None:
-                self.datetime_display.alpha = self.hide_alpha
-                self.datetime_display.draw(self.screen)
-            if self.hide_alpha < 255:
-                image = self.textbox.copy()
-                if self.prev_text_index == self.max_prev_index:
-                    if self.cur_name_text != None:
-                        self.cur_name_text.draw(image)
-                else:
-                    if self.prev_name_text[self.prev_text_index] != None:
-                        self.prev_name_text[self.prev_text_index].draw(image)
-                if self.prev_text_index == self.max_prev_index:
-                    display_text_index = 0
-                    for i in range(len(self.cur_dialogue)):
-                        if i <= display_text_index:
-                            self.cur_dialogue[i].draw(image)
-                        if self.cur_dialogue[i].width == self.cur_dialogue[i].cur_width:
-                            display_text_index += 1
-                else:
-                    for i in range(len(self.prev_dialogue[self.prev_text_index])):
-                        self.prev_dialogue[self.prev_text_index][i].draw(image)
-                image.fill((255,255,255,self.hide_alpha), None, pygame.BLEND_RGBA_MULT)
-                self.screen.blit(image, self.textbox_topleft)
+                layers.add("widget", self.draw_widget, self.datetime_display.rect, self.hide_alpha)
+            layers.add("textbox", self.draw_textbox, self.textbox_layer.rect, self.hide_alpha)
+        if self.state == STATE.CHOOSE:
+            layers.add("choices", self.draw_choices, layers.rect)
+        if self.target_hide_alpha == 255:
+            layers.add("buttons", lambda surface: self.draw_buttons(), layers.rect)
+        if self.notice != None:
+            if pygame.time.get_ticks() < self.notice_time:
+                layers.add("notice", self.draw_notice, self.notice.rect)
             else:
-                image = self.textbox.copy()
-                if self.prev_text_index == self.max_prev_index:
-                    if self.cur_name_text != None:
-                        self.cur_name_text.draw(image)
-                else:
-                    if self.prev_name_text[self.prev_text_index] != None:
-                        self.prev_name_text[self.prev_text_index].draw(image)
-                if self.prev_text_index == self.max_prev_index:
-                    display_text_index = 0
-                    for i in range(len(self.cur_dialogue)):
-                        if i <= display_text_index:
-                            self.cur_dialogue[i].draw(image)
-                        if self.cur_dialogue[i].width == self.cur_dialogue[i].cur_width:
-                            display_text_index += 1
-                else:
-                    for i in range(len(self.prev_dialogue[self.prev_text_index])):
-                        self.prev_dialogue[self.prev_text_index][i].draw(image)
-                self.screen.blit(image, self.textbox_topleft)
+                self.mark_dirty(self.notice.rect)
+                self.notice = None
+
+        ## Once nothing in the scene moves or fades, the background and
+        ## characters are composited once and reused until they change
+        key = None
+        settled = not (self.is_shake or self.has_loaded_scene or self.has_unloaded_scene or self.old_scene != None)
+        if settled and not True in [char.alpha < 255 for char in self.cur_chars]:
+            key = (self.cur_scene, tuple(new_rect) if new_rect != None else None, tuple(self.cur_chars),
+                   self.state in (STATE.READ, STATE.CHOOSE, STATE.OPT_BRANCH, STATE.VAR_BRANCH))
+        layers.compose(self.screen, key)
+
+    def render_backlog_page(self, name, lines):
+        ##########################################################
+        ## Returns the Text objects of a backlog entry's name   ##
+        ## and lines, laid out as they were in the textbox      ##
+        ##########################################################
+        pos = [self.textbox_margin, self.textbox_margin]
+        name_text = Text(name, self.dialogue_font, self.font_antialias, pos, self.dialogue_fontsize, self.dialogue_font_color,
+                         self.dialogue_shadow_color, False, shadow_type=2)
+        texts = []
+        for i in range(len(lines)):
+            pos = [self.textbox_margin * 8, self.textbox_margin + (i + 1) * self.dialogue_fontsize]
+            texts.append(Text(lines[i], self.dialogue_font, self.font_antialias, pos, self.dialogue_fontsize, self.dialogue_prev_color,
+                              self.dialogue_shadow_color, False, shadow_type=2))
+        return name_text, texts
+
+    def is_menu_idle(self, widgets):
+        ##########################################################
+        ## Returns whether every widget of a menu has faded in  ##
+        ## and has no scrolling text left to animate            ##
+        ##########################################################
+        for widget in widgets:
+            if widget.alpha < 255:
+                return False
+            if hasattr(widget, "text") and widget.text.scrollable:
+                return False
+            if hasattr(widget, "button") and widget.button.alpha < 255:
+                return False
+        return True
+
+    def is_scene_idle(self):
+        ##########################################################
+        ## Returns whether the scene is quiescent: the script   ##
+        ## waits on the player and nothing is left to animate   ##
+        ##########################################################
+        if not (self.awaiting_input or self.finished_scene):
+            return False
+        if self.is_skip or self.is_auto or self.is_shake:
+            return False
+        if self.has_set_wait or self.has_set_hide or self.has_loaded_scene or self.has_unloaded_scene:
+            return False
+        if self.hide_alpha != self.target_hide_alpha:
+            return False
+        if self.textbox_layer.is_scrolling(self.cur_dialogue):
+            return False
+        for char in self.cur_chars:
+            if char.alpha < 255:
+                return False
+        if self.state == STATE.CHOOSE and not self.is_menu_idle(self.cur_options):
+            return False
+        if self.hide_alpha == 255 and not self.is_menu_idle(self.ingame_buttons):
+            return False
+        if self.notice != None and self.notice.alpha < 255:
+            return False
+        return True
+
+    def wait_for_input(self, is_idle):
+        ##########################################################
+        ## Blocks on the event queue while nothing is animating ##
+        ## so idle screens do not keep a CPU core busy. Wakes   ##
+        ## up on input or after CONST.IDLE_WAIT milliseconds    ##
+        ##########################################################
+        if not is_idle or pygame.event.peek():
+            return
+        pygame.time.set_timer(CONST.IDLE_EVENT, CONST.IDLE_WAIT)
+        e = pygame.event.wait()
+        pygame.time.set_timer(CONST.IDLE_EVENT, 0)
+        ## Hand the input back to the game loop's own polling
+        if e.type != CONST.IDLE_EVENT:
+            pygame.event.post(e)
+
+    def mark_dirty(self, rect):
+        ################################################
+        ## Records a screen region changed this frame ##
+        ################################################
+        self.frame_rects.append(pygame.Rect(rect))
+
+    def update_display(self):
+        ##########################################################
+        ## Pushes the frame to the display. In dirty rectangle  ##
+        ## mode only the regions that changed are updated, and  ##
+        ## the whole screen only during transitions and shakes  ##
+        ##########################################################
+        signature = (self.cur_scene, self.old_scene, self.new_anchor, self.old_anchor,
+                     self.state, self.hide_alpha, self.target_hide_alpha)
+        chars = list(self.cur_chars)
+        full = (not self.dirty_rects or self.is_shake or self.has_loaded_scene or
+                self.has_unloaded_scene or signature != self.frame_signature)
+
+        ## Characters that left the scene leave their region behind
+        for char in self.frame_chars:
+            if char not in chars:
+                self.mark_dirty(char.rect)
+
+        if full:
+            pygame.display.flip()
+        elif len(self.frame_rects) > 0:
+            pygame.display.update(self.frame_rects)
+
+        self.frame_signature = signature
+        self.frame_chars = chars
+        self.frame_rects = []
 
     def run_scene(self, filename, is_continue):
         if not is_continue:
@@ -2510,13 +2726,28 @@ class Main:
             self.lines = open("data/scenes/%s.nes" %(filename), "r").readlines()
         except:
             self.raise_exception(0, filename)
+        self.script = Script(self.lines) ## Compile the scene once
+        self.prefetcher.reset()
         self.cur_file = filename
+        self.read_log.open_scene(self.cur_file, len(self.script))
         self.running = True
 
         while self.running:
             self.clock.tick(60)
             
-            if not self.finished_scene and self.interpret_line(self.lines[self.index]):
+            ## Start loading the assets of the lines coming up next
+            self.prefetcher.scan(self.script, self.index)
+
+            ## Keep executing lines that complete instantly until one blocks,
+            ## within a per-frame budget so the frame rate stays stable
+            budget = self.lines_per_frame
+            self.awaiting_input = False
+            if self.is_skip:
+                self.run_fast_forward()
+            while budget > 0 and self.running and not self.finished_scene and not self.is_skip:
+                budget -= 1
+                if not self.interpret_line(self.script[self.index]):
+                    break
                 self.index += 1
                 if self.index >= len(self.lines):
                     self.index = len(self.lines) - 1
@@ -2572,69 +2803,54 @@ class Main:
                     new_anchor_rect = self.cur_scene.get_rect(bottomright=new)
 
             if not self.is_comment:
-                self.screen.fill((0,0,0))
-                if self.old_scene != None:                      
-                    self.screen.blit(self.old_scene, old_anchor_rect)
-                if self.cur_scene != None:
-                    self.screen.blit(self.cur_scene, new_anchor_rect)
-
-                if self.state == STATE.READ:
-                    self.draw_dialogue()
-
-                elif self.state == STATE.CHOOSE:
-                    self.draw_dialogue()
-                    for option in self.cur_options:
-                        if option.rect.collidepoint(self.get_mouse_pos()):                        
-                            option.update(color=self.button_hover_color)
-                        else:
-                            option.update(color=self.button_font_color)
-                        option.draw(self.screen)
-
-                elif self.state == STATE.OPT_BRANCH:
-                    self.draw_dialogue()
-                    if not self.finished_scene:
-                        while not (self.lines[self.index].lstrip().startswith(".branch") and\
-                                   len(self.lines[self.index].replace(":","").lstrip().rstrip().split(" ")) == 1):
-                            self.index += 1
-                            if self.index >= len(self.lines):
-                                self.index = len(self.lines) - 1
-                                self.finished_scene = True
-
-                elif self.state == STATE.VAR_BRANCH:
-                    self.draw_dialogue()
-                    if not self.finished_scene:
-                        while not self.lines[self.index].lstrip().startswith(".if"):
-                            self.index += 1
-                            if self.index >= len(self.lines):
-                                self.index = len(self.lines) - 1
-                                self.finished_scene = True
+                self.compose_frame(old_anchor_rect if self.old_scene != None else None,
+                                   new_anchor_rect if self.cur_scene != None else None)
 
-            if self.is_skip:
-                self.run_next()
-            elif self.is_auto:
+            if self.is_auto:
                 self.run_auto()
 
-            if not self.is_comment:
-                if self.target_hide_alpha == 255:
-                    self.draw_buttons()
-
-            ## Allow character images to fade in over each other
+            ## Allow character images to fade in over each other, dropping
+            ## any character covered by an opaque one at the same position
+            covered = []
             for i in range(len(self.cur_chars)):
                 for j in range(i+1, len(self.cur_chars)):
                     if self.cur_chars[i].pos == self.cur_chars[j].pos and self.cur_chars[j].alpha == 255:
-                        self.cur_chars.remove(self.cur_chars[i])
+                        covered.append(self.cur_chars[i])
+                        break
+            for char in covered:
+                self.cur_chars.remove(char)
 
-            pygame.display.flip()
+            self.update_display()
+
+            ## Write out the quick save while nothing else needs the time
+            is_idle = self.is_scene_idle()
+            if is_idle:
+                self.write_quick_save()
+            self.wait_for_input(is_idle)
 
             for e in pygame.event.get():
                 if e.type == pygame.QUIT:
                     self._quit()
+                ## The window was uncovered or refocused, so push the next frame whole
+                elif e.type == pygame.VIDEOEXPOSE or (e.type == pygame.ACTIVEEVENT and e.gain):
+                    self.frame_signature = None
                 elif e.type == pygame.KEYDOWN:
+                    ## Any input stops fast-forwarding
+                    self.is_skip = False
                     if e.key == pygame.K_ESCAPE:
                         self._quit()
+                    ## Rewind to the previous textbox or choice
+                    elif e.key == pygame.K_BACKSPACE:
+                        self.run_rollback()
+                    elif e.key == pygame.K_F5:
+                        self.run_quick_save()
+                    elif e.key == pygame.K_F9:
+                        self.run_quick_load()
                 elif e.type == pygame.MOUSEBUTTONDOWN:
                     if not self.handle_buttons():
-                        if self.state == STATE.READ:
+                        if self.is_skip:
+                            self.is_skip = False
+                        elif self.state == STATE.READ:
                             self.run_next()
                         elif self.state == STATE.CHOOSE:
                             for option in self.cur_options:
@@ -0,0 +1,166 @@
+import pygame, os, glob, threading, traceback
+from pygame.locals import *
+from script import OP
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+##########################################################################
+## Prefetcher                                                           ##
+## -------------------------------------------------------------------- ##
+## Class that reads ahead of the interpreter in a compiled scene and    ##
+## loads the images and sounds it is about to need on a worker thread.  ##
+## Images are decoded but left unconverted, so the main thread only has ##
+## to call convert() or convert_alpha() once the command executes.      ##
+##########################################################################
+
+class Prefetcher(object):
+    LOOKAHEAD = 40  ## Number of upcoming script lines to scan for assets
+    CHUNK     = 65536  ## Read size in bytes when warming music files
+
+    #################
+    ## Constructor ##
+    #################
+    def __init__(self, images):
+        self.images    = images  ## Image cache, whose images need no prefetching
+        self.requests  = queue.Queue()  ## Paths waiting to be loaded
+        self.lock      = threading.Lock()
+        self.wanted    = set()  ## Paths referenced within the lookahead window
+        self.requested = set()  ## Paths queued or already loaded
+        self.results   = {}     ## Path to loaded surface or sound
+        self.owners    = {}     ## Character image path to the directory it was listed from
+        self.index     = None   ## Script index the window was last scanned from
+
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    ####################################################
+    ## Method to list the files a single instruction  ##
+    ## refers to, as (kind, path) pairs. Character    ##
+    ## directories are listed by the worker thread,   ##
+    ## so scanning never touches the disk             ##
+    ####################################################
+    def get_assets(self, instruction):
+        if instruction.error != None:
+            return []
+        if instruction.opcode == OP.SCENEIN:
+            return [("image", "data/images/%s/%s.png" %(instruction.args["folder"], instruction.args["file"]))]
+        elif instruction.opcode == OP.LOAD:
+            return [("bank", "data/images/char/%s/" %(instruction.args[0]))]
+        elif instruction.opcode == OP.MUSIC and len(instruction.args) > 0:
+            return [("music", "data/music/" + instruction.args + ".wav")]
+        elif instruction.opcode == OP.SOUND and len(instruction.args) > 0:
+            return [("sound", "data/sound/" + instruction.args + ".wav")]
+        return []
+
+    ####################################################
+    ## Method to queue the assets referenced by the   ##
+    ## lines ahead of the interpreter, and drop those ##
+    ## that have fallen out of the lookahead window   ##
+    ####################################################
+    def scan(self, script, index):
+        if index == self.index:
+            return
+        self.index = index
+
+        assets = []
+        for i in range(index, min(index + self.LOOKAHEAD, len(script))):
+            assets.extend(self.get_assets(script[i]))
+
+        with self.lock:
+            self.wanted = set([path for kind, path in assets])
+            for path in list(self.results):
+                if path not in self.wanted and self.owners.get(path) not in self.wanted:
+                    del self.results[path]
+                    self.owners.pop(path, None)
+            self.requested &= self.wanted
+            for kind, path in assets:
+                if path not in self.requested and not self.images.contains(path):
+                    self.requested.add(path)
+                    self.requests.put((kind, path))
+
+    ####################################################
+    ## Method to hand over a prefetched asset, or     ##
+    ## None if it has not finished loading yet        ##
+    ####################################################
+    def take(self, path):
+        with self.lock:
+            self.requested.discard(path)
+            self.owners.pop(path, None)
+            return self.results.pop(path, None)
+
+    ###########################################
+    ## Method to forget every pending asset  ##
+    ###########################################
+    def reset(self):
+        with self.lock:
+            self.wanted = set()
+            self.requested = set()
+            self.results = {}
+            self.owners = {}
+            self.index = None
+
+    ####################################################
+    ## Method to load every image of a character      ##
+    ## directory while it stays within the window     ##
+    ####################################################
+    def load_bank(self, path):
+        for filename in glob.glob(os.path.join(path, "*.png")):
+            with self.lock:
+                if path not in self.wanted:
+                    return
+            if self.images.contains(filename):
+                continue
+            try:
+                result = pygame.image.load(filename)
+            except:
+                ## Leave the error to the interpreter's own load
+                continue
+            with self.lock:
+                if path in self.wanted:
+                    self.results[filename] = result
+                    self.owners[filename] = path
+
+    ####################################################
+    ## Method to load a single queued asset if it is  ##
+    ## still within the window                        ##
+    ####################################################
+    def load(self, kind, path):
+        with self.lock:
+            if path not in self.wanted:
+                return
+        if kind == "bank":
+            self.load_bank(path)
+            return
+        try:
+            if kind == "image":
+                result = pygame.image.load(path)
+            elif kind == "sound":
+                result = pygame.mixer.Sound(path)
+            else:
+                ## Music is streamed by the mixer, so only warm the disk cache
+                f = open(path, "rb")
+                while f.read(self.CHUNK):
+                    pass
+                f.close()
+                return
+        except:
+            ## Leave the error to the interpreter's own load
+            return
+        with self.lock:
+            if path in self.wanted:
+                self.results[path] = result
+
+    ###########################################
+    ## Worker thread loading queued assets   ##
+    ###########################################
+    def run(self):
+        while True:
+            kind, path = self.requests.get()
+            try:
+                self.load(kind, path)
+            except Exception:
+                ## Report the failure in the terminal, but keep prefetching
+                traceback.print_exc()
@@ -0,0 +1,146 @@
+import os, mmap, struct
+
+##########################################################################
+## ReadLog                                                              ##
+## -------------------------------------------------------------------- ##
+## Class that records which lines of each scene the player has seen,    ##
+## as one bit per compiled instruction index. Every scene's bitmap      ##
+## lives in a single memory-mapped file behind a fixed-size directory,  ##
+## so checking or marking a line touches a single byte in memory and    ##
+## the file is updated in place as the game goes on. A damaged file is  ##
+## started over, as it only costs the record of which lines were read.  ##
+##########################################################################
+
+class ReadLog(object):
+    NAME    = "read.dat"        ## Name of the bitmap file within the directory
+    MAGIC   = "NEREAD\x00\x01"  ## File signature and format version
+    SCENES  = 256               ## Number of scene entries in the directory
+    SCENE   = 32                ## Bytes reserved for a scene's name
+
+    HEADER  = struct.Struct("<8sI")              ## Signature, scene count
+    ENTRY   = struct.Struct("<%dsII" %(SCENE))   ## Scene name, offset, bit count
+
+    #################
+    ## Constructor ##
+    #################
+    def __init__(self, path):
+        self.filename = os.path.join(path, self.NAME)
+        self.data_start = self.HEADER.size + self.ENTRY.size * self.SCENES
+        if not os.path.exists(self.filename) or os.path.getsize(self.filename) < self.data_start:
+            self.create()
+        self.open_file()
+        try:
+            self.scenes = self.read_directory() ## Scene name to (entry number, offset, bit count)
+        except ValueError:
+            self.data.close()
+            self.file.close()
+            self.create()
+            self.open_file()
+            self.scenes = self.read_directory()
+        self.offset = None  ## Offset of the current scene's bitmap
+        self.bits   = 0     ## Number of lines in the current scene's bitmap
+        self.bitmap = bytearray() ## Copy of the current scene's bitmap
+
+    ##################################################
+    ## Method to create an empty bitmap file        ##
+    ##################################################
+    def create(self):
+        f = open(self.filename + ".tmp", "wb")
+        f.write(self.HEADER.pack(self.MAGIC, self.SCENES))
+        f.write("\x00" * (self.ENTRY.size * self.SCENES))
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        ## Windows cannot rename over an existing file
+        if os.name == "nt" and os.path.exists(self.filename):
+            os.remove(self.filename)
+        os.rename(self.filename + ".tmp", self.filename)
+
+    ##################################################
+    ## Method to open and map the bitmap file       ##
+    ##################################################
+    def open_file(self):
+        self.file = open(self.filename, "r+b")
+        self.data = mmap.mmap(self.file.fileno(), 0)
+
+    ###################################################
+    ## Method to unpack the directory, as a dict of  ##
+    ## scene name to (entry number, offset, bits).   ##
+    ## Raises ValueError if the file is damaged      ##
+    ###################################################
+    def read_directory(self):
+        magic, count = self.HEADER.unpack_from(self.data, 0)
+        if magic != self.MAGIC or count != self.SCENES:
+            raise ValueError("'%s' is not a read log" %(self.filename))
+        scenes = {}
+        for num in range(count):
+            name, offset, bits = self.ENTRY.unpack_from(self.data, self.HEADER.size + self.ENTRY.size * num)
+            if offset > 0:
+                ## Every bitmap must lie after the directory and within the file
+                if offset < self.data_start or offset + (bits + 7)/8 > len(self.data):
+                    raise ValueError("'%s' has a truncated bitmap" %(self.filename))
+                scenes[name.rstrip("\x00")] = (num, offset, bits)
+        return scenes
+
+    ###################################################
+    ## Method to switch to the bitmap of a scene of  ##
+    ## the given number of lines, appending a larger ##
+    ## bitmap that keeps its old bits if it is new   ##
+    ## or has grown                                  ##
+    ###################################################
+    def open_scene(self, scene, length):
+        ## Names are stored truncated, so look them up the same way
+        scene = scene[:self.SCENE]
+        if scene in self.scenes:
+            num, offset, bits = self.scenes[scene]
+        else:
+            num, offset, bits = len(self.scenes), 0, 0
+        if bits < length:
+            if num >= self.SCENES:
+                ## Directory is full, so lines of this scene are never read
+                self.offset = None
+                self.bits = 0
+                self.bitmap = bytearray()
+                return
+            old = self.data[offset:offset + (bits + 7)/8] if offset > 0 else ""
+            self.data.close()
+            self.file.seek(0, 2)
+            offset = self.file.tell()
+            self.file.write(old + "\x00" * ((length + 7)/8 - len(old)))
+            self.file.seek(self.HEADER.size + self.ENTRY.size * num)
+            self.file.write(self.ENTRY.pack(scene, offset, length))
+            self.file.flush()
+            self.data = mmap.mmap(self.file.fileno(), 0)
+            bits = length
+            self.scenes[scene] = (num, offset, bits)
+        self.offset = offset
+        self.bits = bits
+        self.bitmap = bytearray(self.data[offset:offset + (bits + 7)/8])
+
+    ###################################################
+    ## Method to check whether a line of the current ##
+    ## scene has been read                           ##
+    ###################################################
+    def is_read(self, index):
+        if self.offset == None or index >= self.bits:
+            return False
+        return self.bitmap[index/8] & (1 << (index % 8)) != 0
+
+    ###################################################
+    ## Method to mark a line of the current scene as ##
+    ## read                                          ##
+    ###################################################
+    def mark(self, index):
+        if self.offset == None or index >= self.bits:
+            return
+        byte = index/8
+        self.bitmap[byte] |= 1 << (index % 8)
+        ## Write the changed byte through to the mapped file
+        pos = self.offset + byte
+        self.data[pos:pos + 1] = bytes(self.bitmap[byte:byte + 1])
+
+    ###########################################
+    ## Method to write out the marked lines  ##
+    ###########################################
+    def flush(self):
+        self.data.flush()
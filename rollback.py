@@ -0,0 +1,63 @@
+from collections import deque
+
+##########################################################################
+## Rollback                                                             ##
+## -------------------------------------------------------------------- ##
+## Bounded history of interpreter snapshots, each a flat dictionary of  ##
+## field to value. Only the newest snapshot is held in full. Each older ##
+## one is kept as the fields that differ from the snapshot after it, so ##
+## stepping back applies one small delta and memory stays bounded.      ##
+##########################################################################
+
+class Rollback(object):
+    #################
+    ## Constructor ##
+    #################
+    def __init__(self, size):
+        self.size    = size  ## Largest number of snapshots to keep
+        self.current = None  ## Newest snapshot in full
+        self.deltas  = deque(maxlen=max(0, size - 1)) ## Reverse deltas, oldest first
+
+    def __len__(self):
+        if self.current == None:
+            return 0
+        return len(self.deltas) + 1
+
+    ###################################################
+    ## Method to record a new snapshot, keeping the  ##
+    ## previous one as its difference to this one    ##
+    ###################################################
+    def push(self, snapshot):
+        if self.size <= 0:
+            return
+        if self.current != None:
+            delta = {}
+            for key in self.current:
+                if snapshot.get(key) != self.current[key]:
+                    delta[key] = self.current[key]
+            for key in snapshot:
+                if key not in self.current:
+                    delta[key] = None
+            self.deltas.append(delta)
+        self.current = snapshot
+
+    ###################################################
+    ## Method to remove and return the newest        ##
+    ## snapshot, making the one before it current    ##
+    ###################################################
+    def pop(self):
+        snapshot = self.current
+        if len(self.deltas) > 0:
+            previous = dict(snapshot)
+            previous.update(self.deltas.pop())
+            self.current = previous
+        else:
+            self.current = None
+        return snapshot
+
+    ###########################################
+    ## Method to forget every snapshot       ##
+    ###########################################
+    def clear(self):
+        self.current = None
+        self.deltas.clear()
@@ -0,0 +1,160 @@
+import os, mmap, struct
+
+##########################################################################
+## SaveContainer                                                        ##
+## -------------------------------------------------------------------- ##
+## Class that stores every save slot in one file, as an alternative to  ##
+## SaveStore with the same interface. The file starts with a fixed-size ##
+## slot directory followed by the slots' save strings. Listing slots    ##
+## only reads the directory, and reading a slot maps one contiguous     ##
+## region of the file.                                                  ##
+##########################################################################
+
+class SaveContainer(object):
+    NAME    = "saves.dat"   ## Name of the container within the directory
+    MAGIC   = "NESAVE\x00\x01"  ## File signature and format version
+    SLOTS   = 128           ## Number of slot entries in the directory
+    STAMP   = 32            ## Bytes reserved for a slot's timestamp
+
+    HEADER  = struct.Struct("<8sI")            ## Signature, slot count
+    ENTRY   = struct.Struct("<QIhh%ds" %(STAMP))  ## Offset, length, x, y, timestamp
+
+    #################
+    ## Constructor ##
+    #################
+    def __init__(self, path, legacy=None):
+        self.path = path  ## Directory holding the container
+        self.filename = os.path.join(path, self.NAME)
+        self.data_start = self.HEADER.size + self.ENTRY.size * self.SLOTS
+        if not os.path.exists(self.filename):
+            self.create(legacy)
+
+    ##################################################
+    ## Method to create an empty container, then    ##
+    ## import the slots of a legacy save store      ##
+    ##################################################
+    def create(self, legacy):
+        f = open(self.filename + ".tmp", "wb")
+        f.write(self.HEADER.pack(self.MAGIC, self.SLOTS))
+        f.write("\x00" * (self.ENTRY.size * self.SLOTS))
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        os.rename(self.filename + ".tmp", self.filename)
+
+        if legacy != None:
+            slots = legacy.list_slots()
+            for num in slots:
+                x, y, stamp = slots[num]
+                if num < self.SLOTS:
+                    self.write(num, x, y, stamp, ["".join(legacy.read(num)).decode("utf-8")])
+
+    ##################################################
+    ## Method to map the container for reading      ##
+    ##################################################
+    def open_map(self):
+        f = open(self.filename, "rb")
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        f.close()
+        return data
+
+    ##################################################
+    ## Method to unpack every directory entry, as   ##
+    ## (offset, length, x, y, timestamp) tuples     ##
+    ##################################################
+    def read_directory(self, data):
+        magic, count = self.HEADER.unpack_from(data, 0)
+        if magic != self.MAGIC:
+            raise IOError("'%s' is not a save container" %(self.filename))
+        return [self.ENTRY.unpack_from(data, self.HEADER.size + self.ENTRY.size * i) for i in range(count)]
+
+    ###################################################
+    ## Method to list the saved slots, as a dict of  ##
+    ## slot number to (x, y, timestamp)              ##
+    ###################################################
+    def list_slots(self):
+        data = self.open_map()
+        slots = {}
+        entries = self.read_directory(data)
+        data.close()
+        for num in range(len(entries)):
+            offset, length, x, y, stamp = entries[num]
+            if length > 0:
+                stamp = stamp.rstrip("\x00").decode("utf-8")
+                slots[num] = (x, y, stamp if len(stamp) > 0 else None)
+        return slots
+
+    ###################################################
+    ## Method to write a save slot and its directory ##
+    ## entry, given the save file as unicode chunks. ##
+    ## The save is appended before the entry points  ##
+    ## to it, so a crash leaves the old slot intact  ##
+    ###################################################
+    def write(self, num, x, y, stamp, chunks):
+        if num >= self.SLOTS:
+            raise IndexError("Save slot %d is out of range" %(num))
+        stamp = (stamp or u"").encode("utf-8")[:self.STAMP]
+
+        f = open(self.filename, "r+b")
+        f.seek(0, 2)
+        offset = f.tell()
+        for chunk in chunks:
+            f.write(chunk.encode("utf-8"))
+        length = f.tell() - offset
+        f.flush()
+        os.fsync(f.fileno())
+        f.seek(self.HEADER.size + self.ENTRY.size * num)
+        f.write(self.ENTRY.pack(offset, length, x, y, stamp))
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+
+        ## Reclaim the regions of overwritten saves once they are most of the file
+        if offset > 2 * (self.get_live_size() + self.data_start):
+            self.compact()
+
+    ###################################################
+    ## Method to count the bytes of live save data   ##
+    ###################################################
+    def get_live_size(self):
+        data = self.open_map()
+        size = sum([entry[1] for entry in self.read_directory(data)])
+        data.close()
+        return size
+
+    ###################################################
+    ## Method to rewrite the container with only the ##
+    ## live save strings, replacing it atomically    ##
+    ###################################################
+    def compact(self):
+        data = self.open_map()
+        entries = self.read_directory(data)
+        f = open(self.filename + ".tmp", "wb")
+        f.write(self.HEADER.pack(self.MAGIC, len(entries)))
+        offset = self.data_start
+        for old_offset, length, x, y, stamp in entries:
+            f.write(self.ENTRY.pack(offset if length > 0 else 0, length, x, y, stamp))
+            offset += length
+        for old_offset, length, x, y, stamp in entries:
+            f.write(data[old_offset:old_offset + length])
+        data.close()
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        ## Windows cannot rename over an existing file
+        if os.name == "nt":
+            os.remove(self.filename)
+        os.rename(self.filename + ".tmp", self.filename)
+
+    ###################################################
+    ## Method to read the lines of a save slot       ##
+    ###################################################
+    def read(self, num):
+        data = self.open_map()
+        offset, length, x, y, stamp = self.read_directory(data)[num]
+        if length == 0:
+            data.close()
+            raise IOError("Save slot %d is empty" %(num))
+        lines = data[offset:offset + length].splitlines(True)
+        data.close()
+        return lines
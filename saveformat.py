@@ -0,0 +1,103 @@
+##########################################################################
+## SaveSerializer                                                       ##
+## -------------------------------------------------------------------- ##
+## Class that turns the state of a game into the text of a save file.   ##
+## Yields the file as a stream of small unicode chunks that are written ##
+## out one by one, so saving never builds the whole backlog into one    ##
+## string. The first line records the format version, and files of      ##
+## older versions are read back into the same backlog and fields.       ##
+##########################################################################
+
+class SaveSerializer(object):
+    VERSION  = 3          ## Save file format version written
+    VERSIONS = (1, 2, 3)  ## Save file format versions that can be read
+
+    ###################################################
+    ## Method to decode a utf-8 byte string from the ##
+    ## scene files into unicode                      ##
+    ###################################################
+    def to_unicode(self, string):
+        if isinstance(string, unicode):
+            return string
+        return string.decode("utf-8")
+
+    ###################################################
+    ## Method to stream out a save file, given the   ##
+    ## backlog as a list of (name, lines) pairs of   ##
+    ## plain strings and a list of (key, value)      ##
+    ## pairs for the remaining fields                ##
+    ###################################################
+    def dump(self, backlog, fields):
+        yield u"version: %d\n" %(self.VERSION)
+        yield u"begin\n"
+        for name, lines in backlog:
+            yield u"name: %s\n" %(self.to_unicode(name).rstrip())
+            for line in lines:
+                yield self.to_unicode(line) + u"\n"
+        yield u"end\n"
+        for key, value in fields:
+            yield u"%s: %s\n" %(key, self.to_unicode(value))
+
+    ###################################################
+    ## Method to get the format version of a save    ##
+    ## file's lines, or None if it is unreadable.    ##
+    ## Version 1 files have no version line          ##
+    ###################################################
+    def get_version(self, lines):
+        if len(lines) == 0 or not lines[0].startswith("version:"):
+            return 1
+        try:
+            return int(lines[0].split(":", 1)[1])
+        except ValueError:
+            return None
+
+    ###################################################
+    ## Method to read a save file's lines back into  ##
+    ## the backlog as (name, lines) pairs and the    ##
+    ## remaining fields as (key, value) pairs        ##
+    ###################################################
+    def load(self, lines):
+        backlog = []
+        fields = []
+        in_backlog = False
+        for line in lines:
+            if in_backlog:
+                if line.startswith("end"):
+                    in_backlog = False
+                elif line.startswith("name:"):
+                    backlog.append((line.split(":", 1)[1].lstrip().rstrip(), []))
+                elif len(backlog) > 0:
+                    backlog[-1][1].append(line.lstrip().rstrip())
+            elif line.startswith("begin"):
+                in_backlog = True
+            elif ":" in line and not line.startswith("version:"):
+                key, value = line.split(":", 1)
+                fields.append((key.rstrip(), value.lstrip().rstrip()))
+        return backlog, fields
+
+    ###################################################
+    ## Method to list the fields of a save file for  ##
+    ## a GameState record, as (key, value) pairs.    ##
+    ## Fields still at the value a new game starts   ##
+    ## with are left out                             ##
+    ###################################################
+    def get_fields(self, state):
+        fields = [("scene", state.scene), ("index", "%d" %(state.index))]
+        if tuple(state.background) != ("null", "null"):
+            fields.append(("background", "%s, %s" %(state.background[0], state.background[1])))
+        fields.append(("text_index", "%d" %(state.text_index)))
+        if state.widget != "null":
+            fields.append(("widget", state.widget))
+        for var in sorted(state.variables):
+            ## Only nonzero variables are recorded
+            if state.variables[var] != 0:
+                fields.append(("nonzero_var", "%s, %d" %(var, state.variables[var])))
+        if state.music != None:
+            fields.append(("music", state.music))
+        if state.shake != None:
+            fields.append(("shake", "%d, %d" %(state.shake[0], state.shake[1])))
+        for bank in sorted(state.banks):
+            fields.append(("load", "%s, %d" %(state.banks[bank], bank)))
+        for char in state.chars:
+            fields.append(("draw", "%d, %d, %d, %s" %(char[0], char[1], char[2], char[3])))
+        return fields
@@ -0,0 +1,116 @@
+import os, glob
+
+##########################################################################
+## SaveStore                                                            ##
+## -------------------------------------------------------------------- ##
+## Class that manages the save slot files of a save directory. Keeps a  ##
+## small index of every slot's grid position and timestamp, so the      ##
+## save and load menus never open the save files themselves. Both the   ##
+## save files and the index are replaced atomically on every write.     ##
+##########################################################################
+
+class SaveStore(object):
+    INDEX = "saves.idx"  ## Name of the slot index file within the directory
+
+    #################
+    ## Constructor ##
+    #################
+    def __init__(self, path):
+        self.path  = path  ## Directory holding the save files
+        self.slots = None  ## Slot number to (x, y, timestamp), read lazily
+
+    #################################################
+    ## Method to get the file name of a save slot  ##
+    #################################################
+    def get_filename(self, num):
+        return os.path.join(self.path, "%03d.jsav" %(num))
+
+    ##################################################
+    ## Method to write a stream of unicode chunks   ##
+    ## to a file so that readers only ever see      ##
+    ## either its old or new contents               ##
+    ##################################################
+    def write_atomic(self, filename, chunks):
+        temp = filename + ".tmp"
+        f = open(temp, "wb")
+        for chunk in chunks:
+            f.write(chunk.encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+        ## Windows cannot rename over an existing file
+        if os.name == "nt" and os.path.exists(filename):
+            os.remove(filename)
+        os.rename(temp, filename)
+
+    ##################################################
+    ## Method to read the position and timestamp    ##
+    ## fields out of a whole save file              ##
+    ##################################################
+    def scan_file(self, filename):
+        x, y, stamp = 0, 0, None
+        for line in open(filename, "r").readlines():
+            if line.startswith("xy:"):
+                temp = line.split(":")[1].split(",")
+                x, y = int(temp[0]), int(temp[1])
+            elif line.startswith("datetime"):
+                stamp = line.split(":", 1)[1].lstrip().rstrip()
+        return x, y, stamp
+
+    ##################################################
+    ## Method to rebuild the slot index by scanning ##
+    ## every save file, for directories without one ##
+    ##################################################
+    def rebuild(self):
+        self.slots = {}
+        for filename in glob.glob(os.path.join(self.path, "*.jsav")):
+            try:
+                num = int(os.path.basename(filename).split(".")[0])
+                self.slots[num] = self.scan_file(filename)
+            except:
+                continue
+        self.write_index()
+
+    ###########################################
+    ## Method to write out the slot index    ##
+    ###########################################
+    def write_index(self):
+        string = ""
+        for num in sorted(self.slots):
+            x, y, stamp = self.slots[num]
+            string += "%03d: %d, %d, %s\n" %(num, x, y, stamp or "")
+        self.write_atomic(os.path.join(self.path, self.INDEX), [string])
+
+    ###################################################
+    ## Method to list the saved slots, as a dict of  ##
+    ## slot number to (x, y, timestamp)              ##
+    ###################################################
+    def list_slots(self):
+        if self.slots == None:
+            try:
+                self.slots = {}
+                for line in open(os.path.join(self.path, self.INDEX), "r").readlines():
+                    num, temp = line.split(":", 1)
+                    temp = temp.split(",", 2)
+                    stamp = temp[2].lstrip().rstrip()
+                    self.slots[int(num)] = (int(temp[0]), int(temp[1]), stamp if len(stamp) > 0 else None)
+            except:
+                ## Missing or corrupt index, fall back on the save files
+                self.rebuild()
+        return self.slots
+
+    ###################################################
+    ## Method to write a save slot and its index     ##
+    ## entry, given the save file as unicode chunks  ##
+    ###################################################
+    def write(self, num, x, y, stamp, chunks):
+        self.list_slots()
+        self.write_atomic(self.get_filename(num), chunks)
+        self.slots[num] = (x, y, stamp)
+        self.write_index()
+
+    ###################################################
+    ## Method to read the lines of a save slot       ##
+    ###################################################
+    def read(self, num):
+        return open(self.get_filename(num), "r").readlines()
@@ -0,0 +1,79 @@
+import threading
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+##########################################################################
+## SaveWriter                                                           ##
+## -------------------------------------------------------------------- ##
+## Class that writes save slots into a save store on a worker thread,   ##
+## so slow disks never stall the game loop. Writes run one at a time in ##
+## the order they were made, and the store's own atomic writes keep the ##
+## previous save intact if the game dies halfway through one.           ##
+##########################################################################
+
+class SaveWriter(object):
+    #################
+    ## Constructor ##
+    #################
+    def __init__(self, store):
+        self.store    = store          ## Save store to write into
+        self.requests = queue.Queue()  ## Writes waiting for the worker
+        self.lock     = threading.Lock()
+        self.pending  = {}  ## Slot number to number of unfinished writes
+        self.errors   = {}  ## Slot number to the error its last write raised
+
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    ###################################################
+    ## Method to queue a save slot write, given the  ##
+    ## save file as a stream of unicode chunks. The  ##
+    ## chunks must not depend on state that changes  ##
+    ## once the write has been queued                ##
+    ###################################################
+    def write(self, num, x, y, stamp, chunks):
+        with self.lock:
+            self.pending[num] = self.pending.get(num, 0) + 1
+            self.errors.pop(num, None)
+        self.requests.put((num, x, y, stamp, chunks))
+
+    ###################################################
+    ## Method to check whether a slot is still being ##
+    ## written                                       ##
+    ###################################################
+    def is_pending(self, num):
+        with self.lock:
+            return self.pending.get(num, 0) > 0
+
+    ###################################################
+    ## Method to take the error of a slot's last     ##
+    ## write, or None if it succeeded                ##
+    ###################################################
+    def get_error(self, num):
+        with self.lock:
+            return self.errors.pop(num, None)
+
+    ###################################################
+    ## Method to block until every queued write has  ##
+    ## reached the save store                        ##
+    ###################################################
+    def flush(self):
+        self.requests.join()
+
+    ###########################################
+    ## Worker thread writing queued saves    ##
+    ###########################################
+    def run(self):
+        while True:
+            num, x, y, stamp, chunks = self.requests.get()
+            try:
+                self.store.write(num, x, y, stamp, chunks)
+            except Exception as e:
+                with self.lock:
+                    self.errors[num] = e
+            with self.lock:
+                self.pending[num] -= 1
+            self.requests.task_done()
@@ -0,0 +1,302 @@
+##########################################################################
+## OP                                                                   ##
+## -------------------------------------------------------------------- ##
+## Static structure for the opcodes of a compiled scene instruction.    ##
+## Every line of a scene file compiles to exactly one instruction, so   ##
+## instruction indices and scene file line numbers stay identical.      ##
+##########################################################################
+
+class OP:
+    COMMENT    = 0    ## Blank line or comment
+    FORCEQUIT  = 1    ## .forcequit
+    LOAD       = 2    ## .load(name, bank)
+    UNLOAD     = 3    ## .load(bank) or .load(-1)
+    TEXT       = 4    ## .text(...) header or .text terminator
+    WAIT       = 5    ## .wait(frames)
+    SHAKE      = 6    ## .shake(x, y) or .shake
+    CHOICE     = 7    ## .choice header or terminator
+    OPTION     = 8    ## N:label inside a .choice block
+    BRANCH     = 9    ## .branch N: header or .branch terminator
+    SETANCHOR  = 10   ## .setanchor(anchor)
+    SCENEIN    = 11   ## .scenein(folder, file, type, ...)
+    SCENEOUT   = 12   ## .sceneout(type, ...)
+    MUSIC      = 13   ## .music(name)
+    SOUND      = 14   ## .sound(name)
+    SETFADE    = 15   ## .setfade(rate)
+    HIDE       = 16   ## .hide
+    SHOW       = 17   ## .show
+    SWAP       = 18   ## .swap(scene)
+    WIDGET     = 19   ## .widget(label, anchor)
+    VARIABLE   = 20   ## $var = value, $var += value, $var -= value
+    IF         = 21   ## .if $var op value: header or .if terminator
+    STRING     = 22   ## Raw line of dialogue text
+
+##########################################################################
+## Instruction                                                          ##
+## -------------------------------------------------------------------- ##
+## Class that defines a single pre-parsed line of a scene file. Holds   ##
+## the opcode, its parsed arguments, and any scripting error found      ##
+## while parsing, which is only raised once the line is executed.       ##
+##########################################################################
+
+class Instruction(object):
+    #################
+    ## Constructor ##
+    #################
+    def __init__(self, opcode, line, args=None, error=None):
+        self.opcode = opcode  ## Opcode from the OP structure
+        self.line   = line    ## Stripped source line, without comments
+        self.args   = args    ## Parsed arguments for the opcode
+        self.error  = error   ## Pending (number, argument) scripting error
+
+##########################################################################
+## Script                                                               ##
+## -------------------------------------------------------------------- ##
+## Class that compiles the lines of a .nes scene file into a list of    ##
+## instructions once, so the interpreter never has to re-split or       ##
+## re-parse a line while it blocks on it frame after frame.             ##
+##########################################################################
+
+class Script(object):
+    #################
+    ## Constructor ##
+    #################
+    def __init__(self, lines):
+        self.lines = lines  ## Raw lines of the scene file
+        self.instructions = [self.compile_line(line) for line in lines]
+        self.jumps = self.link() ## Header index to terminator index
+
+    def __len__(self):
+        return len(self.instructions)
+
+    def __getitem__(self, index):
+        return self.instructions[index]
+
+    ###########################################################
+    ## Method to resolve every .branch N: and .if header to  ##
+    ## the index of its matching terminator, so a branch not ##
+    ## taken can be skipped without scanning the script      ##
+    ###########################################################
+    def link(self):
+        jumps = {}
+        stacks = {OP.BRANCH:[], OP.IF:[]}
+        for i in range(len(self.instructions)):
+            instruction = self.instructions[i]
+            if instruction.opcode not in stacks:
+                continue
+            if instruction.args != None:
+                stacks[instruction.opcode].append(i)
+            elif len(stacks[instruction.opcode]) > 0:
+                jumps[stacks[instruction.opcode].pop()] = i
+
+        ## Headers without a terminator skip to the end of the scene
+        for opcode in stacks:
+            for i in stacks[opcode]:
+                jumps[i] = len(self.instructions)
+        return jumps
+
+    ########################################################
+    ## Method to parse the parameters between parentheses ##
+    ########################################################
+    def get_params(self, line):
+        temp = line.replace(")","").split("(")
+        if len(temp) < 2:
+            return None
+        return temp[1]
+
+    ##############################################################
+    ## Method to parse optional zoom parameters for transitions ##
+    ##############################################################
+    def get_transition(self, kind, params):
+        args = {"type":kind, "zoom_scale":None, "target_scale":None, "zoom_rate":None}
+        if kind in ("zoomin", "zoomout", "fadezoomin", "fadezoomout"):
+            keys = ("zoom_scale", "target_scale", "zoom_rate")
+            for i in range(min(len(params), 3)):
+                try:
+                    args[keys[i]] = float(params[i].lstrip().rstrip())
+                except:
+                    return args, (100, None)
+        return args, None
+
+    ###################################################
+    ## Method to compile a single line of the script ##
+    ###################################################
+    def compile_line(self, line):
+        ## Get rid of all comments, which can begin with a # anywhere in the line
+        line = line.lstrip().split("#")[0].rstrip()
+
+        if len(line) == 0:
+            return Instruction(OP.COMMENT, line)
+
+        elif line.startswith(".forcequit"):
+            return Instruction(OP.FORCEQUIT, line)
+
+        elif line.startswith(".load"):
+            params = self.get_params(line)
+            if params == None:
+                return Instruction(OP.UNLOAD, line, error=(200, None))
+            temp = params.split(",")
+            ## A single parameter clears characters from the scene
+            if len(temp) < 2:
+                target = temp[0].lstrip().rstrip()
+                if target.isdigit() or target == '-1':
+                    return Instruction(OP.UNLOAD, line, int(target))
+                return Instruction(OP.UNLOAD, line, None)
+            try:
+                bank = int(temp[1])
+            except:
+                bank = None
+            return Instruction(OP.LOAD, line, (temp[0].lstrip().rstrip(), bank))
+
+        elif line.startswith(".text"):
+            params = self.get_params(line)
+            if params == None:
+                return Instruction(OP.TEXT, line, None, (200, None))
+            args = {"char":0, "sub":0, "pos":0, "name":"", "ignore":True, "skip":False}
+            error = None
+            for phrase in params.split(","):
+                ## Parse out the parameters
+                keywords = phrase.lstrip().rstrip().split("=")
+                param = keywords[0].lstrip().rstrip()
+                if len(keywords) < 2:
+                    error = error or (200, None)
+                    continue
+                value = keywords[1].lstrip().rstrip()
+                if param == "char":
+                    args["ignore"] = False
+                    try:
+                        args["char"] = int(value)
+                    except:
+                        error = error or (101, None)
+                elif param == "sub":
+                    try:
+                        args["sub"] = int(value)
+                    except:
+                        error = error or (102, None)
+                elif param == "pos":
+                    try:
+                        args["pos"] = int(value)
+                    except:
+                        error = error or (103, None)
+                elif param == "name":
+                    args["name"] = value
+                elif param == "skip":
+                    args["skip"] = True
+            return Instruction(OP.TEXT, line, args, error)
+
+        elif line.startswith(".wait"):
+            try:
+                return Instruction(OP.WAIT, line, int(self.get_params(line)))
+            except:
+                return Instruction(OP.WAIT, line, 0, (104, None))
+
+        elif line.startswith(".shake"):
+            params = self.get_params(line)
+            ## Empty parameters turn off shaking
+            if params == None:
+                return Instruction(OP.SHAKE, line, None)
+            try:
+                temp = params.split(",")
+                return Instruction(OP.SHAKE, line, [int(temp[0]), int(temp[1])])
+            except:
+                return Instruction(OP.SHAKE, line, [0,0], (105, None))
+
+        elif line.startswith(".choice"):
+            return Instruction(OP.CHOICE, line)
+
+        elif len(line) >= 2 and line[0].isdigit():
+            ## Only an option inside a choice block, otherwise dialogue
+            temp = line.split(":")
+            try:
+                return Instruction(OP.OPTION, line, (int(temp[0]), temp[1].lstrip().rstrip()))
+            except:
+                return Instruction(OP.STRING, line, line)
+
+        elif line.startswith(".branch"):
+            temp = line.replace(":","").lstrip().rstrip().split(" ")
+            if len(temp) > 1:
+                try:
+                    return Instruction(OP.BRANCH, line, int(temp[1]))
+                except:
+                    return Instruction(OP.BRANCH, line, -1, (106, None))
+            return Instruction(OP.BRANCH, line, None)
+
+        elif line.startswith(".setanchor"):
+            return Instruction(OP.SETANCHOR, line, (self.get_params(line) or "").lstrip().rstrip())
+
+        elif line.startswith(".scenein"):
+            params = self.get_params(line)
+            temp = params.split(",") if params != None else []
+            if len(temp) < 2:
+                return Instruction(OP.SCENEIN, line, None, (200, None))
+            kind = temp[2].lstrip().rstrip() if len(temp) > 2 else None
+            args, error = self.get_transition(kind, temp[3:])
+            args["folder"] = temp[0].lstrip().rstrip()
+            args["file"]   = temp[1].lstrip().rstrip()
+            return Instruction(OP.SCENEIN, line, args, error)
+
+        elif line.startswith(".sceneout"):
+            temp = (self.get_params(line) or "").split(",")
+            args, error = self.get_transition(temp[0].lstrip().rstrip(), temp[1:])
+            return Instruction(OP.SCENEOUT, line, args, error)
+
+        elif line.startswith(".music"):
+            return Instruction(OP.MUSIC, line, (self.get_params(line) or "").lstrip().rstrip())
+
+        elif line.startswith(".sound"):
+            return Instruction(OP.SOUND, line, (self.get_params(line) or "").lstrip().rstrip())
+
+        elif line.startswith(".setfade"):
+            try:
+                return Instruction(OP.SETFADE, line, int(self.get_params(line)))
+            except:
+                return Instruction(OP.SETFADE, line, None, (107, None))
+
+        elif line.startswith(".hide"):
+            return Instruction(OP.HIDE, line)
+
+        elif line.startswith(".show"):
+            return Instruction(OP.SHOW, line)
+
+        elif line.startswith(".swap"):
+            return Instruction(OP.SWAP, line, (self.get_params(line) or "").lstrip().rstrip())
+
+        elif line.startswith(".widget"):
+            temp = (self.get_params(line) or "").split(",")
+            if len(temp) < 2:
+                return Instruction(OP.WIDGET, line, None, (200, None))
+            args = (temp[0].lstrip().rstrip(), temp[1].lstrip().rstrip())
+            if args[1] not in ("topleft","midtop","topright","midleft","center","midright","bottomleft","midbottom","bottomright"):
+                return Instruction(OP.WIDGET, line, args, (250, None))
+            return Instruction(OP.WIDGET, line, args)
+
+        elif line.startswith("$"):
+            if "+" in line:
+                op = "+="
+            elif "-" in line:
+                op = "-="
+            elif "=" in line:
+                op = "="
+            else:
+                return Instruction(OP.VARIABLE, line, None)
+            temp = line.split(op)
+            if len(temp) < 2:
+                return Instruction(OP.VARIABLE, line, None, (150, None))
+            value = temp[1].lstrip().rstrip()
+            if value.isdigit():
+                value = int(value)
+            return Instruction(OP.VARIABLE, line, (temp[0].lstrip().rstrip(), op, value))
+
+        elif line.startswith(".if"):
+            temp = line.split(" ")
+            if len(temp) == 1:
+                return Instruction(OP.IF, line, None)
+            if len(temp) < 4:
+                return Instruction(OP.IF, line, (None, None, None), (150, None))
+            comp = temp[3].replace(":","").rstrip()
+            ## Allow for intervariable and variable-constant comparisons
+            if comp.isdigit():
+                comp = int(comp)
+            return Instruction(OP.IF, line, (temp[1].lstrip().rstrip(), temp[2].lstrip().rstrip(), comp))
+
+        return Instruction(OP.STRING, line, line.lstrip().rstrip())
@@ -1,5 +1,6 @@
 import pygame
 from pygame.locals import *
+from fade import Fadeable
 
 ##########################################################################
 ## Slider                                                               ##
@@ -9,7 +10,7 @@ from pygame.locals import *
 ## modify a floating point variable.                                    ##
 ##########################################################################
     
-class Slider(object):
+class Slider(Fadeable):
     #################
     ## Constructor ##
     #################
@@ -27,16 +28,6 @@ class Slider(object):
     ## Method to draw to target surface ##
     ######################################  
     def draw(self, surface):
-        ## If the current alpha channel is at all transparent, fade in
-        if self.alpha < 255:
-            image = self.image.copy()
-            image.fill((255,255,255,self.alpha), None, pygame.BLEND_RGBA_MULT)
-            surface.blit(image, self.rect)
-            self.button.draw(surface)
-            self.alpha += 12
-            if self.alpha > 255:
-                self.alpha = 255
-        ## If we are already opaque, no need to update alpha channel
-        else:
-            surface.blit(self.image, self.rect)
-            self.button.draw(surface)
+        ## Fade in until we are opaque, then draw the draggable button
+        changed = self.draw_faded(surface, self.image, self.rect)
+        return self.button.draw(surface) or changed
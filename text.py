@@ -1,5 +1,6 @@
 import pygame
 from pygame.locals import *
+from fontcache import FontCache
 
 ##########################################################################
 ## Text                                                                 ##
@@ -19,10 +20,7 @@ class Text(object):
         string = string.decode('utf-8')
         self.string = u"{}".format(string)
 
-        try:
-            self.font   = pygame.font.Font("data/fonts/%s.ttf" %(fontname), size)
-        except Exception as e:
-            self.font   = pygame.font.SysFont("Arial", size)
+        self.font   = FontCache.get(fontname, size)
         self.pos    = pos
         self.color  = color
         self.hover  = hover
@@ -113,5 +111,6 @@ class Text(object):
         elif string != self.string:
             self.string = string
             self.render = self.font.render(string, self.antialias, self.color)
+            self.s_render = self.font.render(string, self.antialias, self.shadow)
             self.width  = self.render.get_width()
 
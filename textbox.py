@@ -0,0 +1,72 @@
+import pygame
+from pygame.locals import *
+
+##########################################################################
+## TextBox                                                              ##
+## -------------------------------------------------------------------- ##
+## Class that defines the dialogue textbox layer. Keeps the textbox     ##
+## graphic composited with the speaker's name and dialogue lines, and   ##
+## only rebuilds it while text scrolls or when its contents change.     ##
+##########################################################################
+
+class TextBox(object):
+    #################
+    ## Constructor ##
+    #################
+    def __init__(self, image, pos):
+        self.image   = image  ## Textbox graphic to composite onto
+        self.pos     = pos    ## Top-left anchoring position
+        self.rect    = pygame.Rect(pos[0], pos[1], image.get_width(), image.get_height())
+        self.surface = None   ## Cached composited textbox surface
+        self.key     = None   ## Contents the cached surface was built from
+        self.dirty   = True   ## Whether the cached surface must be rebuilt
+
+    ###################################################
+    ## Method to describe what the textbox displays  ##
+    ###################################################
+    def get_key(self, name, lines, alpha):
+        return (name, tuple(lines), tuple([text.cur_width for text in lines]), alpha)
+
+    ###################################################
+    ## Method to check whether any line still has    ##
+    ## to scroll out, which changes it every frame   ##
+    ###################################################
+    def is_scrolling(self, lines):
+        for text in lines:
+            if text.scrollable and text.cur_width < text.width:
+                return True
+        return False
+
+    ######################################
+    ## Method to draw to target surface ##
+    ######################################
+    def draw(self, surface, name, lines, alpha, scroll=False):
+        if self.key != self.get_key(name, lines, alpha) or self.is_scrolling(lines):
+            self.dirty = True
+
+        ## Rebuild the composited textbox only if necessary
+        rebuilt = self.dirty
+        if self.dirty:
+            image = self.image.copy()
+            if name != None:
+                name.draw(image)
+            if scroll:
+                ## Scroll out each line only once the previous one is done
+                display_text_index = 0
+                for i in range(len(lines)):
+                    if i <= display_text_index:
+                        lines[i].draw(image)
+                    if lines[i].width == lines[i].cur_width:
+                        display_text_index += 1
+            else:
+                for text in lines:
+                    text.draw(image)
+            ## If the textbox is at all transparent, apply the alpha channel
+            if alpha < 255:
+                image.fill((255,255,255,alpha), None, pygame.BLEND_RGBA_MULT)
+            self.surface = image
+            self.key = self.get_key(name, lines, alpha)
+            self.dirty = False
+
+        surface.blit(self.surface, self.pos)
+        return rebuilt
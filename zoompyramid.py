@@ -0,0 +1,64 @@
+import pygame, threading
+
+##########################################################################
+## ZoomPyramid                                                          ##
+## -------------------------------------------------------------------- ##
+## Class that precomputes a pyramid of keyframes of a transition scene  ##
+## at half, quarter and smaller scales on a worker thread. Each frame   ##
+## of a zoom is then scaled from the smallest keyframe still at least   ##
+## as large as it, so zooming out of a large background never rescales  ##
+## the full-resolution image. Until a keyframe is ready the scene       ##
+## itself is used. Zooms that stay above half scale need no keyframes,  ##
+## as only the source pixels that land on-screen are scaled, which are  ##
+## at most four times as many as the frame draws.                       ##
+##########################################################################
+
+class ZoomPyramid(object):
+    #################
+    ## Constructor ##
+    #################
+    def __init__(self, surface, low):
+        self.surface = surface  ## Full-resolution transition scene
+        self.source  = surface.copy() ## Copy for the worker, as the scene's alpha changes while fading
+        self.low     = low      ## Smallest scale the zoom reaches
+        self.levels  = []       ## (scale, keyframe) pairs, largest first
+        self.cancelled = False  ## Whether the zoom ended before every level was built
+
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    ###################################################
+    ## Method to get the keyframe to scale a frame   ##
+    ## from, as (keyframe, scale of the keyframe)    ##
+    ###################################################
+    def get(self, scale):
+        image, base = self.surface, 1.0
+        for level, keyframe in list(self.levels):
+            if level < scale:
+                break
+            image, base = keyframe, level
+        return image, base
+
+    ###################################################
+    ## Method to stop building levels once the zoom  ##
+    ## is over                                       ##
+    ###################################################
+    def cancel(self):
+        self.cancelled = True
+
+    ###########################################
+    ## Worker thread halving the scene until ##
+    ## the zoom's smallest scale is covered  ##
+    ###########################################
+    def run(self):
+        image, level = self.source, 1.0
+        while not self.cancelled and level / 2 >= self.low and min(image.get_size()) > 1:
+            size = (image.get_width() / 2, image.get_height() / 2)
+            try:
+                image = pygame.transform.smoothscale(image, size)
+            except ValueError:
+                ## Smooth scaling only handles 24 and 32 bit surfaces
+                image = pygame.transform.scale(image, size)
+            level /= 2
+            self.levels.append((level, image))